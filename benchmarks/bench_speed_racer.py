@@ -0,0 +1,211 @@
+"""Benchmarks for Speed Racer. Runs on headless machines through SDL's dummy
+video and audio drivers and prints the results as JSON:
+
+    python benchmarks/bench_speed_racer.py --output results.json
+
+Each build (Mac and Windows) is written to a temporary folder from the
+game's bundle, laid out the way the player unzips it, and measured in its
+own process:
+
+    load_assets   seconds to load every image and sound
+    game_loop     frames per second of the real run_game() loop, with the
+                  car steered by a scripted bot, plus the frame profiler's
+                  per-phase timings
+    simulation    headless race_sim steps per second, and race_batch
+                  race-steps per second when NumPy is installed
+    text          microseconds per text render, uncached and cached
+"""
+
+import argparse, json, os, shutil, statistics, subprocess, sys, tempfile
+import time
+from pathlib import Path
+
+MAIN_FILES_PATH = Path(__file__).resolve().parent.parent / 'main_files'
+sys.path.insert(0, str(MAIN_FILES_PATH))
+
+import bundles
+
+# Each build's script module, the folder its bundle is unzipped into and
+# the folder the game runs from, relative to the working folder.
+BUILDS = {
+    'mac': ('speed_racer', Path('downloads'), Path('.')),
+    'windows': ('speed_racerx64', Path('.'), Path('speed_racerx64')),
+}
+
+
+def time_calls(func, repeat):
+    """Call func repeat times and return the median seconds per call."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_load_assets(game, repeat):
+    """Time loading every asset."""
+    return {'seconds': time_calls(game.load_assets, repeat)}
+
+
+def bench_game_loop(game, seconds):
+    """Run the real game loop with a scripted bot for about the given number
+    of seconds and return its frame rate and phase timings."""
+    import tournament
+
+    steps = int(seconds * game.SIM_RATE)
+
+    class ScriptedRace(game.RaceState):
+        """A race that steers itself and ends after a set number of steps."""
+
+        def step(self, action=None):
+            crashed = super().step(tournament.dodge_policy(self))
+            return crashed or self.pace >= steps
+
+    game.FPS = 0
+    game.RaceState = ScriptedRace
+    game.profiler = game.FrameProfiler(size=steps * 100)
+
+    start = time.perf_counter()
+    game.run_game()
+    elapsed = time.perf_counter() - start
+
+    summary = game.profiler.summary()
+    return {
+        'seconds': elapsed,
+        'frames': summary['frames'],
+        'fps': summary['frames'] / elapsed,
+        'p50_ms': summary['p50_ms'],
+        'p99_ms': summary['p99_ms'],
+        'phase_ms': summary['phase_ms'],
+    }
+
+
+def bench_simulation(races):
+    """Measure headless simulation speed."""
+    import race_sim, tournament
+
+    results = {}
+    for name in ('idle', 'dodge'):
+        policy = tournament.POLICIES[name]
+        start = time.perf_counter()
+        steps = sum(race_sim.run_race(policy, seed).pace
+                    for seed in range(races))
+        results[f'{name}_steps_per_second'] = (
+            steps / (time.perf_counter() - start))
+
+    try:
+        import race_batch
+    except ImportError:
+        return results
+
+    batch = race_batch.BatchRace(races * 10, seed=0)
+    frames = 500
+    start = time.perf_counter()
+    for _ in range(frames):
+        batch.step()
+        batch.reset(batch.crashed)
+    elapsed = time.perf_counter() - start
+    results['batch_race_steps_per_second'] = batch.n * frames / elapsed
+    return results
+
+
+def bench_text(game, repeat):
+    """Time rendering the score text with and without the text cache."""
+    font = game.create_font(40)
+    texts = [f'Score: {score}' for score in range(0, 10 * repeat, 10)]
+
+    start = time.perf_counter()
+    for text in texts:
+        font.render(text, False, game.BLACK)
+    uncached = (time.perf_counter() - start) / len(texts)
+
+    game.render_text(texts[0], 40, game.BLACK)
+    start = time.perf_counter()
+    for _ in texts:
+        game.render_text(texts[0], 40, game.BLACK)
+    cached = (time.perf_counter() - start) / len(texts)
+
+    return {'uncached_us': 1e6 * uncached, 'cached_us': 1e6 * cached}
+
+
+def run_build(build, args):
+    """Benchmark one build in this process and return its results."""
+    module_name, unzip_dir, run_dir = BUILDS[build]
+
+    # Write out the build so the benchmark never touches the real game data.
+    workdir = Path(tempfile.mkdtemp(prefix='speed_racer_bench_'))
+    try:
+        bundles.write_tree(build, workdir / unzip_dir)
+        os.chdir(workdir / run_dir)
+        sys.path.insert(0, str(workdir / unzip_dir / module_name / 'scripts'))
+
+        # The development tools the benchmark uses aren't in the bundles, so
+        # they come from the game folder.
+        sys.path.append(str(bundles.GAME_SOURCE / 'scripts'))
+
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+        import pygame
+        game = __import__(module_name)
+
+        # Set up the game like main() does, without its loops.
+        pygame.init()
+        game.MAINCLOCK = pygame.time.Clock()
+        game.DISPLAYSURF = pygame.display.set_mode((game.WINDOWWIDTH,
+                                                    game.WINDOWHEIGHT))
+        results = {'load_assets': bench_load_assets(game, args.repeat)}
+        game.load_pb()
+
+        results['game_loop'] = bench_game_loop(game, args.seconds)
+        results['simulation'] = bench_simulation(args.races)
+        results['text'] = bench_text(game, args.repeat * 20)
+        pygame.quit()
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    """Benchmark every build, each in a fresh process, and print JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--build', choices=BUILDS,
+                        help='benchmark only this build, in this process')
+    parser.add_argument('--seconds', type=float, default=10,
+                        help='how long to run the game loop')
+    parser.add_argument('--races', type=int, default=200,
+                        help='headless races per simulation benchmark')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='repeats of the asset and text benchmarks')
+    parser.add_argument('--output', help='also write the JSON to this file')
+    args = parser.parse_args()
+
+    # Benchmarking a build changes folders, so pin the output path first.
+    output_path = Path(args.output).resolve() if args.output else None
+
+    if args.build:
+        results = run_build(args.build, args)
+    else:
+        results = {
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'builds': {},
+        }
+        passed = ['--seconds', str(args.seconds), '--races', str(args.races),
+                  '--repeat', str(args.repeat)]
+        for build in BUILDS:
+            output = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()), '--build',
+                 build] + passed,
+                check=True, capture_output=True, text=True).stdout
+            results['builds'][build] = json.loads(output)
+
+    text = json.dumps(results, indent=2)
+    if output_path:
+        output_path.write_text(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,161 @@
-from flask import Flask, render_template
+import base64, binascii, mimetypes, sqlite3, sys
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from pathlib import Path
+from threading import Lock, local
+
+from flask import (Flask, render_template, request, jsonify, url_for,
+                   send_from_directory, send_file, abort)
+
+from static_assets import (build_manifest, find_precompressed, ENCODINGS,
+                           COMPRESSIBLE_SUFFIXES)
+from bundles import PLATFORMS, bundle_path
+import leaderboard
+
+# The game's simulation code lives with the game scripts.
+SCRIPTS_PATH = Path(__file__).parent / 'game' / 'scripts'
+sys.path.insert(0, str(SCRIPTS_PATH))
+
+from replay import check_replay
+
+# Replay verification limits. An hour of play is far longer than any real
+# run and still re-simulates in about a second.
+MAX_REPLAY_BYTES = 64 * 1024
+MAX_REPLAY_FRAMES = 60 * 60 * 60
+VERIFY_TIMEOUT = 30
+
+# Static files linked with their content hash never change, so browsers may
+# keep them for a year. Pages are checked again on every visit, but only
+# sent when they changed.
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+PAGES = {'home', 'download', 'credits'}
+
+# Leaderboard submission limits. Replays are sent base64 encoded, which
+# makes them a third bigger.
+MAX_SUBMISSIONS = 20
+MAX_SUBMIT_BYTES = MAX_SUBMISSIONS * MAX_REPLAY_BYTES * 2
+
+# The database holding the leaderboard and counting how many times each
+# platform's game bundle was asked for in full.
+DB_PATH = Path(__file__).parent / 'speed_racer.db'
 
 app = Flask(__name__, static_folder='static')
 
+# Turn down bodies bigger than any route takes before reading them, even
+# when they are sent in chunks without a Content-Length.
+app.config['MAX_CONTENT_LENGTH'] = MAX_SUBMIT_BYTES
+
+# Fingerprint the static files and find their precompressed copies once.
+# Restart the app after changing them.
+static_manifest = build_manifest(app.static_folder)
+static_encodings = find_precompressed(app.static_folder)
+
+# Replays are re-simulated in a pool of worker processes, started on the
+# first request that needs it.
+verify_pool = None
+verify_pool_lock = Lock()
+
+# Every server thread keeps its own database connection.
+db_local = local()
+
+
+def get_verify_pool():
+    """Return the replay verification process pool, starting it if needed."""
+    global verify_pool
+
+    with verify_pool_lock:
+        if verify_pool is None:
+            verify_pool = ProcessPoolExecutor()
+        return verify_pool
+
+
+def verify_replay(data):
+    """Re-simulate a replay in the worker pool and return the result."""
+    future = get_verify_pool().submit(check_replay, data, MAX_REPLAY_FRAMES)
+    return future.result(timeout=VERIFY_TIMEOUT)
+
+
+def get_db():
+    """Return this thread's database connection, opening it if needed."""
+    db = getattr(db_local, 'db', None)
+    if db is None:
+        db = db_local.db = sqlite3.connect(DB_PATH, isolation_level=None)
+        leaderboard.setup_db(db)
+        db.execute('CREATE TABLE IF NOT EXISTS downloads ('
+                   'platform TEXT PRIMARY KEY, count INTEGER NOT NULL)')
+    return db
+
+
+def count_download(platform):
+    """Add one to a platform's download count."""
+    get_db().execute('INSERT INTO downloads (platform, count) VALUES (?, 1) '
+                     'ON CONFLICT (platform) DO UPDATE SET count = count + 1',
+                     (platform,))
+
+
+def static_url(filename):
+    """Return the URL of a static file, fingerprinted with its hash."""
+    return url_for('static', filename=filename,
+                   v=static_manifest.get(filename))
+
+
+@app.context_processor
+def inject_static_url():
+    """Make static_url() available to the templates."""
+    return {'static_url': static_url}
+
+
+def send_static(filename):
+    """Send a static file, as its precompressed copy in the best encoding
+    the browser accepts if it has one."""
+    suffixes = dict(ENCODINGS)
+    for encoding in static_encodings.get(filename, []):
+        if request.accept_encodings[encoding]:
+            mimetype = (mimetypes.guess_type(filename)[0]
+                        or 'application/octet-stream')
+            response = send_from_directory(
+                app.static_folder, filename + suffixes[encoding],
+                mimetype=mimetype)
+            response.content_encoding = encoding
+            break
+    else:
+        response = app.send_static_file(filename)
+
+    # Caches must keep the copies for each encoding apart.
+    if Path(filename).suffix in COMPRESSIBLE_SUFFIXES:
+        response.vary.add('Accept-Encoding')
+    return response
+
+# Serve static files through send_static() instead of Flask's own handler.
+app.view_functions['static'] = send_static
+
+
+@app.after_request
+def set_cache_headers(response):
+    """Let browsers cache fingerprinted static files for good, and answer
+    repeat page visits with 304 Not Modified when nothing changed."""
+    if request.endpoint == 'static':
+        filename = request.view_args.get('filename')
+        version = request.args.get('v')
+        if version is not None and version == static_manifest.get(filename):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_MAX_AGE
+            response.cache_control.immutable = True
+
+    elif request.endpoint in PAGES and response.status_code == 200:
+        response.cache_control.no_cache = True
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
+
+@app.errorhandler(413)
+def too_large(error):
+    """Answer bodies over MAX_CONTENT_LENGTH in JSON, like the routes
+    taking them."""
+    return jsonify(error='Too much data.'), 413
+
+
 @app.route('/')
 def home():
     """Speed Racer Home."""
@@ -12,10 +166,157 @@ def download():
     """Speed Racer Download."""
     return render_template('download.html')
 
+@app.route('/download/<platform>')
+def download_bundle(platform):
+    """Speed Racer Bundle Download.
+
+    Sends a platform's game bundle, built from the game folder the first
+    time it is asked for. Bundles are named by a hash of what went into
+    them, which is also their strong ETag. Range requests are supported
+    so interrupted downloads can resume. Whole bundles go to the server in
+    its wsgi.file_wrapper, which sends them with sendfile where it can.
+
+    A download is counted when a GET for the whole bundle starts, so the
+    counts include downloads cut off part way but not resumed ones.
+    """
+    if platform not in PLATFORMS:
+        abort(404)
+    path = bundle_path(platform)
+    folder, _ = PLATFORMS[platform]
+    response = send_file(path, as_attachment=True, conditional=True,
+                         download_name=f'{folder}.zip',
+                         etag=path.stem.rpartition('-')[2])
+
+    if request.method == 'GET' and response.status_code == 200:
+        count_download(platform)
+    return response
+
 @app.route('/credits')
 def credits():
     """Speed Racer Credits."""
     return render_template('credits.html')
 
+@app.route('/verify', methods=['POST'])
+def verify():
+    """Speed Racer Score Verification.
+
+    Takes a replay file as the request body, plays it back headlessly and
+    accepts its score only if the playback ends with the same score. An
+    optional score query argument must match the replay's score too.
+    """
+    if (request.content_length or 0) > MAX_REPLAY_BYTES:
+        return jsonify(accepted=False, error='Replay is too large.'), 413
+    data = request.get_data()
+    if len(data) > MAX_REPLAY_BYTES:
+        return jsonify(accepted=False, error='Replay is too large.'), 413
+
+    try:
+        result = verify_replay(data)
+    except TimeoutError:
+        return jsonify(accepted=False, error='Verification timed out.'), 503
+
+    if 'error' in result:
+        return jsonify(accepted=False, error=result['error']), 400
+
+    claimed = request.args.get('score', type=int)
+    accepted = result['valid'] and claimed in (None, result['claimed_score'])
+    return jsonify(accepted=accepted, **result)
+
+@app.route('/leaderboard', methods=['POST'])
+def submit_scores():
+    """Speed Racer Score Submission.
+
+    Takes a JSON object whose scores list holds up to MAX_SUBMISSIONS
+    objects with a player name, a score and the race's replay, base64
+    encoded, so a game can send every score it has waiting at once. A score
+    is only accepted if its replay plays back to the same score, and each
+    race only counts for the first player to send it.
+
+    Returns a results list in the same order, each saying whether the score
+    was accepted and, if it was, the player's best, rank and the number of
+    players.
+    """
+    if (request.content_length or 0) > MAX_SUBMIT_BYTES:
+        return jsonify(error='Too much data.'), 413
+
+    body = request.get_json(silent=True)
+    scores = body.get('scores') if isinstance(body, dict) else None
+    if not isinstance(scores, list) or len(scores) > MAX_SUBMISSIONS:
+        return jsonify(error='Send a JSON object with a scores list of at '
+                             f'most {MAX_SUBMISSIONS} scores.'), 400
+
+    # Start playing back every replay at once, then go through the scores.
+    replays = [start_replay_check(submission) for submission in scores]
+    results = []
+    for submission, replay in zip(scores, replays):
+        try:
+            results.append(submit_score(submission, replay))
+        except ValueError as error:
+            results.append({'accepted': False, 'error': str(error)})
+    return jsonify(results=results)
+
+@app.route('/leaderboard')
+def top_scores():
+    """Speed Racer Leaderboard. Returns the best players, up to the limit
+    query argument, and the number of players."""
+    limit = request.args.get('limit', 10, type=int)
+    db = get_db()
+    return jsonify(top=leaderboard.top_scores(db, limit),
+                   players=leaderboard.player_count(db))
+
+@app.route('/leaderboard/<player>')
+def player_rank(player):
+    """Speed Racer Player Rank. Returns a player's best score, rank and the
+    number of players."""
+    try:
+        rank = leaderboard.player_rank(get_db(), player)
+    except ValueError as error:
+        return jsonify(error=str(error)), 400
+    if rank is None:
+        return jsonify(error='No scores for this player.'), 404
+    return jsonify(rank)
+
+
+def start_replay_check(submission):
+    """Start playing back a submission's replay in the worker pool. Returns
+    the future, or None if it has no replay or it can't be decoded."""
+    if not isinstance(submission, dict) or 'replay' not in submission:
+        return None
+    try:
+        data = base64.b64decode(submission['replay'], validate=True)
+    except (TypeError, binascii.Error):
+        return None
+    if len(data) > MAX_REPLAY_BYTES:
+        return None
+    return get_verify_pool().submit(check_replay, data, MAX_REPLAY_FRAMES)
+
+
+def submit_score(submission, replay):
+    """Check one submitted score against its replay and add it to the
+    leaderboard. Raises ValueError if it isn't accepted."""
+    if not isinstance(submission, dict):
+        raise ValueError('Each score must be an object.')
+    player = submission.get('player')
+    score = submission.get('score')
+
+    # Only scores a replay backs up are ranked.
+    if 'replay' not in submission:
+        raise ValueError('Scores must come with their replay.')
+    if replay is None:
+        raise ValueError('Replay is not valid base64 or is too large.')
+    try:
+        result = replay.result(timeout=VERIFY_TIMEOUT)
+    except TimeoutError:
+        raise ValueError('Verification timed out.')
+    if not result['valid'] or result['claimed_score'] != score:
+        raise ValueError(result.get('error',
+                                    'Replay does not match the score.'))
+
+    db = get_db()
+    best = leaderboard.submit_score(db, player, score, result['seed'])
+    return {'accepted': True, 'player': player, 'score': score,
+            'best': best, 'rank': leaderboard.score_rank(db, best),
+            'players': leaderboard.player_count(db)}
+
 if __name__ == '__main__':
-    app.run()
\ No newline at end of file
+    app.run()
@@ -0,0 +1,163 @@
+"""Game bundle builder for Speed Racer. The game's images, sounds and scripts
+are kept once, in the game folder, for every platform. A platform's bundle
+is a zip of that folder inside the platform's own folder name, with the
+main script renamed for the platform and pointed at where it gets unzipped.
+
+Bundles are cached by a hash of everything that goes into them, so each one
+is only zipped once for a given set of files. Run this script at deploy
+time to build every platform's bundle ahead of the first download:
+
+    python bundles.py
+"""
+
+import hashlib, os, tempfile, zipfile
+from pathlib import Path
+from threading import Lock
+
+GAME_SOURCE = Path(__file__).parent / 'game'
+CACHE_PATH = Path(__file__).parent / 'bundle_cache'
+
+# Each platform's folder name, which its main script is named after too,
+# and where the game expects to be unzipped relative to where it runs.
+PLATFORMS = {
+    'mac': ('speed_racer', 'downloads/speed_racer'),
+    'windows': ('speed_racerx64', '.'),
+}
+
+# The main script, and the line in it that each bundle sets for its platform.
+MAIN_SCRIPT = 'scripts/speed_racer.py'
+GAME_PATH_LINE = "GAME_PATH = 'downloads/speed_racer'\n"
+
+# Development tools kept with the game scripts, which the game itself never
+# imports. They are left out of the bundles.
+DEV_SCRIPTS = {'scripts/prescale_images.py', 'scripts/race_batch.py',
+               'scripts/race_env.py', 'scripts/tournament.py'}
+
+# Change this when bundles are laid out differently, to build them again.
+BUNDLE_VERSION = 1
+
+# Files already compressed are stored in the zip as they are. Every entry
+# gets the same date, so the same files always make the same zip.
+STORED_SUFFIXES = {'.mp3', '.png', '.jpeg', '.jpg'}
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+# File hashes, kept with the size and time they were worked out for.
+file_hashes = {}
+
+# Only one bundle is built at a time.
+build_lock = Lock()
+
+
+def game_files():
+    """Yield the path of every file in the game folder, leaving out hidden
+    files, Python's caches and the development tools."""
+    for path in sorted(GAME_SOURCE.rglob('*')):
+        relative_path = path.relative_to(GAME_SOURCE)
+        if (path.is_file() and path.suffix != '.pyc'
+                and relative_path.as_posix() not in DEV_SCRIPTS
+                and not any(part.startswith('.') or part == '__pycache__'
+                            for part in relative_path.parts)):
+            yield path
+
+
+def hash_file(path):
+    """Return the hash of a file's contents. It is only worked out again
+    when the file changes."""
+    stat = path.stat()
+    key = (stat.st_size, stat.st_mtime_ns)
+    if file_hashes.get(path, (None,))[0] != key:
+        file_hashes[path] = (key, hashlib.sha256(path.read_bytes()).digest())
+    return file_hashes[path][1]
+
+
+def bundle_files(platform):
+    """Return a list of (name in the zip, source path) for every file in a
+    platform's bundle."""
+    folder, _ = PLATFORMS[platform]
+    files = []
+    for path in game_files():
+        name = path.relative_to(GAME_SOURCE).as_posix()
+        if name == MAIN_SCRIPT:
+            name = f'scripts/{folder}.py'
+        files.append((f'{folder}/{name}', path))
+    return files
+
+
+def bundle_key(platform):
+    """Return the hash identifying a platform's bundle. It changes whenever
+    anything that goes into the bundle does."""
+    digest = hashlib.sha256(f'{BUNDLE_VERSION} {platform} '
+                            f'{PLATFORMS[platform]}'.encode())
+    for name, path in bundle_files(platform):
+        digest.update(name.encode() + b'\0' + hash_file(path))
+    return digest.hexdigest()[:16]
+
+
+def read_bundle_file(platform, path):
+    """Return a file's contents as they go into a platform's bundle."""
+    data = path.read_bytes()
+    if path.relative_to(GAME_SOURCE).as_posix() != MAIN_SCRIPT:
+        return data
+
+    # Point the main script at where this platform unzips the game.
+    _, game_path = PLATFORMS[platform]
+    script = data.decode('UTF-8')
+    if GAME_PATH_LINE not in script:
+        raise ValueError(f'{MAIN_SCRIPT} does not set GAME_PATH.')
+    return script.replace(GAME_PATH_LINE,
+                          f"GAME_PATH = '{game_path}'\n").encode('UTF-8')
+
+
+def bundle_path(platform):
+    """Return the path of a platform's bundle, building it if it isn't in
+    the cache yet."""
+    folder, _ = PLATFORMS[platform]
+    path = CACHE_PATH / f'{folder}-{bundle_key(platform)}.zip'
+    with build_lock:
+        if not path.exists():
+            build_bundle(platform, path)
+    return path
+
+
+def build_bundle(platform, path):
+    """Zip a platform's bundle to path, and remove its older bundles but
+    the one before it."""
+    folder, _ = PLATFORMS[platform]
+    CACHE_PATH.mkdir(exist_ok=True)
+
+    # Write to a temporary file first, as an older bundle may be mid
+    # download.
+    with tempfile.NamedTemporaryFile(dir=CACHE_PATH, suffix='.tmp',
+                                     delete=False) as file:
+        with zipfile.ZipFile(file, 'w') as bundle:
+            for name, source in bundle_files(platform):
+                info = zipfile.ZipInfo(name, ZIP_DATE)
+                info.external_attr = 0o644 << 16
+                if source.suffix in STORED_SUFFIXES:
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                bundle.writestr(info, read_bundle_file(platform, source))
+    os.replace(file.name, path)
+
+    # Keep the bundle this one replaces, as another thread may have just
+    # been handed its path to send.
+    old_paths = [old_path for old_path in CACHE_PATH.glob(f'{folder}-*.zip')
+                 if old_path != path]
+    old_paths.sort(key=lambda old_path: old_path.stat().st_mtime_ns)
+    for old_path in old_paths[:-1]:
+        old_path.unlink(missing_ok=True)
+
+
+def write_tree(platform, folder):
+    """Write a platform's bundle unzipped into a folder, the way a player
+    unzips it."""
+    for name, source in bundle_files(platform):
+        path = Path(folder) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(read_bundle_file(platform, source))
+
+
+if __name__ == '__main__':
+    for platform in PLATFORMS:
+        print(f'{platform}: {bundle_path(platform)}')
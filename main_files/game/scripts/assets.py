@@ -0,0 +1,73 @@
+"""Image asset pipeline for Speed Racer. IMAGE_SIZES lists the size every
+image is drawn at. The images folder is pre-scaled to those sizes by running
+prescale_images.py once whenever an image changes, so the game only has to
+load them and convert them to the display's pixel format, which keeps blits
+from converting every pixel on every frame."""
+
+import pygame
+
+from race_sim import CAR_WIDTH, CAR_HEIGHT, ARROW_SIZE, OBSTACLE_SIZES, ROCK
+from race_sim import BARREL, OIL
+
+# The size every image is drawn at.
+IMAGE_SIZES = {
+    'title_background.jpeg': (1000, 600),
+    'race_track.png': (900, 500),
+    'car.png': (CAR_WIDTH, CAR_HEIGHT),
+    'arrow.png': (ARROW_SIZE, ARROW_SIZE),
+    'rock.png': (OBSTACLE_SIZES[ROCK], OBSTACLE_SIZES[ROCK]),
+    'barrel.png': (OBSTACLE_SIZES[BARREL], OBSTACLE_SIZES[BARREL]),
+    'oil.png': (OBSTACLE_SIZES[OIL], OBSTACLE_SIZES[OIL]),
+}
+
+# Images without any transparency. These convert to a faster opaque format.
+OPAQUE_IMAGES = {'title_background.jpeg', 'race_track.png'}
+
+
+def scale_image(img, name):
+    """Scale an image to its final size, unless it is already that size."""
+    size = IMAGE_SIZES[name]
+    if img.get_size() != size:
+        img = pygame.transform.scale(img, size)
+    return img
+
+
+def read_image(folder, name):
+    """Read an image from disk at its final size. This does not need the
+    display, so it is safe to call from a loading thread."""
+    return scale_image(pygame.image.load(f'{folder}/{name}'), name)
+
+
+def convert_image(img, name):
+    """Convert a read image to the display's pixel format.
+
+    The display has to be set up before calling this.
+    """
+    if name in OPAQUE_IMAGES:
+        return img.convert()
+    return img.convert_alpha()
+
+
+def load_image(folder, name):
+    """Load an image at its final size in the display's pixel format."""
+    return convert_image(read_image(folder, name), name)
+
+
+def build_atlas(imgs):
+    """Pack images side by side into one atlas surface.
+
+    imgs maps names to images. Returns the atlas and a dict mapping each
+    name to the area of the atlas holding its image, for use with blits().
+    """
+    width = sum(img.get_width() for img in imgs.values())
+    height = max(img.get_height() for img in imgs.values())
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha()
+
+    areas = {}
+    x = 0
+    for name, img in imgs.items():
+        # Copy the pixels as they are instead of blending them onto the atlas.
+        areas[name] = atlas.blit(img, (x, 0),
+                                 special_flags=pygame.BLEND_RGBA_MAX)
+        x += img.get_width()
+    return atlas, areas
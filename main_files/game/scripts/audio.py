@@ -0,0 +1,107 @@
+"""Audio for Speed Racer. The AudioManager keeps every sound effect decoded
+in memory for the whole run and streams the music from a PCM WAV copy of
+the MP3, decoded once and cached on disk, so starting the music costs
+neither an MP3 decode nor an MP3 seek.
+
+The mixer's buffer size can be set with the SPEED_RACER_AUDIO_BUFFER
+environment variable. Smaller buffers start sounds sooner but can crackle on
+slow machines."""
+
+import os, wave
+from pathlib import Path
+
+import pygame
+
+# Set up the mixer constants.
+FREQUENCY = 44100
+SAMPLE_SIZE = -16
+CHANNELS = 2
+BUFFER_SIZE = int(os.environ.get('SPEED_RACER_AUDIO_BUFFER', 512))
+
+
+def init_mixer(buffer_size=BUFFER_SIZE):
+    """Start the mixer with the given buffer size, if it isn't already."""
+    if not pygame.mixer.get_init():
+        pygame.mixer.pre_init(FREQUENCY, SAMPLE_SIZE, CHANNELS, buffer_size)
+        pygame.mixer.init()
+
+
+def cache_music(path, cache_folder):
+    """Decode an MP3 to a WAV file in the cache folder and return its path.
+
+    The WAV is only written again if the MP3 is newer. Returns the MP3's own
+    path if the mixer isn't running 16 bit, which is all WAV can store.
+    """
+    frequency, size, channels = pygame.mixer.get_init()
+    if abs(size) != 16:
+        return path
+
+    # Name the cache after the mixer format so a different one decodes anew.
+    path = Path(path)
+    cache_path = (Path(cache_folder)
+                  / f'{path.stem}-{frequency}-{channels}.wav')
+    if (cache_path.exists()
+            and cache_path.stat().st_mtime >= path.stat().st_mtime):
+        return cache_path
+
+    # Write to a temporary file first so a half written cache is never used.
+    samples = pygame.mixer.Sound(str(path)).get_raw()
+    temp_path = cache_path.with_suffix('.tmp')
+    with wave.open(str(temp_path), 'wb') as file:
+        file.setnchannels(channels)
+        file.setsampwidth(2)
+        file.setframerate(frequency)
+        file.writeframes(samples)
+    os.replace(temp_path, cache_path)
+    return cache_path
+
+
+class AudioManager:
+    """The game's music and sound effects."""
+
+    def __init__(self, sounds_folder, cache_folder):
+        """Set up the manager for the sounds in sounds_folder, caching
+        decoded music in cache_folder."""
+        self.sounds_folder = Path(sounds_folder)
+        self.cache_folder = Path(cache_folder)
+        self.sounds = {}
+        self.music_started = False
+
+    def load(self, music, sounds):
+        """Start the mixer, decode every sound effect and load the music.
+        This can run on a loading thread."""
+        init_mixer()
+        for name in sounds:
+            self.sounds[name] = pygame.mixer.Sound(
+                str(self.sounds_folder / name))
+
+        # Fall back to streaming the MP3 if the cache can't be written.
+        music_path = self.sounds_folder / music
+        try:
+            music_path = cache_music(music_path, self.cache_folder)
+        except (OSError, pygame.error):
+            pass
+        pygame.mixer.music.load(str(music_path))
+        self.music_started = False
+
+    def play_music(self):
+        """Play the music from the start, looping. After the first time this
+        rewinds the paused stream instead of loading it again."""
+        if self.music_started:
+            pygame.mixer.music.rewind()
+            pygame.mixer.music.unpause()
+        else:
+            pygame.mixer.music.play(-1)
+            self.music_started = True
+
+    def stop_music(self):
+        """Stop the music, keeping the stream open to play again."""
+        pygame.mixer.music.pause()
+
+    def play_sound(self, name):
+        """Play a sound effect."""
+        self.sounds[name].play()
+
+    def stop_sound(self, name):
+        """Stop a sound effect."""
+        self.sounds[name].stop()
@@ -0,0 +1,29 @@
+"""Pre-scale Speed Racer's images to the sizes in assets.IMAGE_SIZES. Run it
+once whenever an image changes:
+
+    python prescale_images.py ../images
+
+This is a development tool, so it is left out of the game's bundles."""
+
+import sys
+from pathlib import Path
+
+import pygame
+
+from assets import IMAGE_SIZES, scale_image
+
+
+def prescale_images(folder):
+    """Scale every image in the folder to its final size in place."""
+    for name in IMAGE_SIZES:
+        path = Path(folder) / name
+        img = pygame.image.load(str(path))
+        if img.get_size() == IMAGE_SIZES[name]:
+            continue
+
+        pygame.image.save(scale_image(img, name), str(path))
+        print(f'Scaled {name} to {IMAGE_SIZES[name]}')
+
+
+if __name__ == '__main__':
+    prescale_images(sys.argv[1] if len(sys.argv) > 1 else '../images')
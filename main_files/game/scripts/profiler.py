@@ -0,0 +1,111 @@
+"""Frame time profiler for Speed Racer. The game loop calls start_frame()
+at the top of every frame and mark() after each of its phases. The time
+every phase took is kept for the last RING_SIZE frames, which is enough for
+an on-screen summary and to dump a trace to CSV or JSON on exit.
+
+It also keeps the input latency of the last RING_SIZE key presses: the time
+from a press being read to the first frame showing it being sent to the
+display."""
+
+import csv, json, time
+from collections import deque
+from pathlib import Path
+
+# How many frames of timings are kept.
+RING_SIZE = 600
+
+
+class FrameProfiler:
+    """Per-phase frame timings in a ring buffer."""
+
+    def __init__(self, size=RING_SIZE):
+        """Set up an empty profiler keeping size frames."""
+        self.frames = deque(maxlen=size)
+        self.latencies = deque(maxlen=size)
+        self.frame_count = 0
+        self.phases = []
+        self.current = None
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+
+    def start_frame(self):
+        """Start timing a new frame."""
+        now = time.perf_counter()
+        if self.current is not None:
+            self.frames.append((self.frame_start, now - self.frame_start,
+                                self.current))
+        self.current = {}
+        self.frame_count += 1
+        self.frame_start = self.last_mark = now
+
+    def mark(self, phase):
+        """Record the time since the last mark as the phase's time."""
+        now = time.perf_counter()
+        if self.current is None:
+            return
+        if phase not in self.current and phase not in self.phases:
+            self.phases.append(phase)
+        elapsed = now - self.last_mark
+        self.current[phase] = self.current.get(phase, 0.0) + elapsed
+        self.last_mark = now
+
+    def add_latency(self, seconds):
+        """Record the input latency of one key press."""
+        self.latencies.append(seconds)
+
+    def frame_times(self):
+        """Return the recorded frame times in seconds, oldest first."""
+        return [frame_time for _, frame_time, _ in self.frames]
+
+    def summary(self):
+        """Return the p50 and p99 frame time in milliseconds, the average
+        FPS, the average milliseconds per phase and the p50 and p99 input
+        latency in milliseconds, which are None before any key press."""
+        times = sorted(self.frame_times())
+        if not times:
+            return None
+
+        phase_ms = {phase: 1000 * sum(phases.get(phase, 0.0)
+                                      for _, _, phases in self.frames)
+                    / len(times)
+                    for phase in self.phases}
+        latencies = sorted(self.latencies)
+        return {
+            'frames': len(times),
+            'p50_ms': 1000 * percentile(times, 50),
+            'p99_ms': 1000 * percentile(times, 99),
+            'fps': len(times) / sum(times),
+            'phase_ms': phase_ms,
+            'input_p50_ms': (1000 * percentile(latencies, 50)
+                             if latencies else None),
+            'input_p99_ms': (1000 * percentile(latencies, 99)
+                             if latencies else None),
+        }
+
+    def dump(self, path):
+        """Write the recorded frames to a .json or .csv file."""
+        path = Path(path)
+        if path.suffix == '.json':
+            trace = {
+                'summary': self.summary(),
+                'frames': [{'start': start, 'frame_ms': 1000 * frame_time,
+                            **{phase: 1000 * seconds
+                               for phase, seconds in phases.items()}}
+                           for start, frame_time, phases in self.frames],
+            }
+            path.write_text(json.dumps(trace, indent=1))
+            return
+
+        with path.open('w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['start', 'frame_ms'] + self.phases)
+            for start, frame_time, phases in self.frames:
+                writer.writerow([f'{start:.6f}', f'{1000 * frame_time:.3f}']
+                                + [f'{1000 * phases.get(phase, 0.0):.3f}'
+                                   for phase in self.phases])
+
+
+def percentile(sorted_values, percent):
+    """Return the nearest-rank percentile of an already sorted list."""
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[index]
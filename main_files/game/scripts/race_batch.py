@@ -0,0 +1,180 @@
+"""Vectorized batch simulator for Speed Racer. A BatchRace keeps N independent
+races in NumPy arrays and advances all of them with one step() call, using
+the same spawn, movement, speed and scoring rules as race_sim.RaceState.
+
+Arrows are left out because they are only decoration and never change how
+a race plays out."""
+
+import numpy as np
+
+from race_sim import (TRACKWIDTH, MIDDLE_LANE, TOP_LANE, BOTTOM_LANE, UP, DOWN,
+                      CAR_X, CAR_WIDTH, OBSTACLES, OBSTACLE_SIZES, EXPIRE_X,
+                      START_SPEED, SPEED_INCREASE, SPEED_INTERVAL,
+                      START_OBSTACLE_SPAWN, OBSTACLE_POINTS)
+
+# Obstacle kinds are stored as indexes into OBSTACLES.
+OBSTACLE_SIZE_TABLE = np.array([OBSTACLE_SIZES[kind] for kind in OBSTACLES])
+
+# Obstacle slots per race to start with. The arrays grow when they fill up.
+START_CAPACITY = 8
+
+# Marks a race that has not crashed yet in crash_cause.
+NO_CAUSE = -1
+
+
+class BatchRace:
+    """N independent races stored as arrays and stepped together."""
+
+    def __init__(self, n, seed=None, capacity=START_CAPACITY):
+        """Set up n new races sharing one random generator."""
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+
+        # Per race state.
+        self.car_lane = np.empty(n, dtype=np.int8)
+        self.score = np.empty(n, dtype=np.int64)
+        self.pace = np.empty(n, dtype=np.int64)
+        self.game_speed = np.empty(n, dtype=np.int64)
+        self.obstacle_spawn = np.empty(n, dtype=np.int64)
+        self.obstacle_frame = np.empty(n, dtype=np.int64)
+        self.crashed = np.empty(n, dtype=bool)
+        self.crash_cause = np.empty(n, dtype=np.int8)
+        self.next_seq = np.empty(n, dtype=np.int64)
+
+        # Per obstacle state, one row of slots per race. seq keeps the spawn
+        # order, which decides scoring on the frame a race crashes.
+        self.active = np.zeros((n, capacity), dtype=bool)
+        self.kind = np.zeros((n, capacity), dtype=np.int8)
+        self.lane = np.zeros((n, capacity), dtype=np.int8)
+        self.x = np.zeros((n, capacity), dtype=np.int64)
+        self.seq = np.zeros((n, capacity), dtype=np.int64)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """Restart the races selected by mask, or every race."""
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+
+        self.car_lane[mask] = MIDDLE_LANE
+        self.score[mask] = 0
+        self.pace[mask] = 0
+        self.game_speed[mask] = START_SPEED
+        self.obstacle_spawn[mask] = START_OBSTACLE_SPAWN
+        self.obstacle_frame[mask] = 0
+        self.crashed[mask] = False
+        self.crash_cause[mask] = NO_CAUSE
+        self.next_seq[mask] = 0
+        self.active[mask] = False
+
+    def step(self, actions=None):
+        """Advance every race that has not crashed by one frame.
+
+        actions is an array of UP, DOWN or NONE per race, or None to hold
+        every car in its lane. Returns the crashed array.
+        """
+        alive = ~self.crashed
+
+        # Move the cars.
+        if actions is not None:
+            actions = np.asarray(actions)
+            up = alive & (actions == UP) & (self.car_lane != TOP_LANE)
+            down = alive & (actions == DOWN) & (self.car_lane != BOTTOM_LANE)
+            self.car_lane += up.astype(np.int8) - down.astype(np.int8)
+
+        # Increase the game pace and the speed.
+        self.pace[alive] += 1
+        faster = alive & (self.pace % SPEED_INTERVAL == 0)
+        self.game_speed[faster] += SPEED_INCREASE
+
+        self.spawn_obstacles(alive)
+        self.update_obstacles(alive)
+        return self.crashed
+
+    def spawn_obstacles(self, alive):
+        """Spawn an obstacle in every race whose spawn timer ran out."""
+        due = alive & (self.obstacle_frame >= self.obstacle_spawn)
+        self.obstacle_frame[alive & ~due] += 1
+
+        races = np.flatnonzero(due)
+        if races.size == 0:
+            return
+
+        # Reset the obstacle frames.
+        self.obstacle_frame[races] = 0
+        self.obstacle_spawn[races] -= 1
+
+        # Choose random obstacles. 50% Chance each one targets the car.
+        kinds = self.rng.integers(0, len(OBSTACLES), size=races.size)
+        targets = self.rng.integers(1, 3, size=races.size)
+        lanes = self.car_lane[races].copy()
+        random_lane = targets == 1
+        lanes[random_lane] = self.rng.integers(1, 4, size=random_lane.sum())
+
+        # Put each obstacle in its race's first free slot.
+        free = ~self.active[races]
+        if not free.any(axis=1).all():
+            self.grow()
+            free = ~self.active[races]
+        slots = free.argmax(axis=1)
+
+        self.active[races, slots] = True
+        self.kind[races, slots] = kinds
+        self.lane[races, slots] = lanes
+        self.x[races, slots] = TRACKWIDTH - OBSTACLE_SIZE_TABLE[kinds] // 2
+        self.seq[races, slots] = self.next_seq[races]
+        self.next_seq[races] += 1
+
+    def update_obstacles(self, alive):
+        """Move the obstacles, score the expired ones and detect crashes."""
+        self.x -= np.where(alive, self.game_speed, 0)[:, None]
+        moving = self.active & alive[:, None]
+
+        # Lanes are far enough apart that only the car's lane can hit it.
+        sizes = OBSTACLE_SIZE_TABLE[self.kind]
+        hits = (moving
+                & (self.lane == self.car_lane[:, None])
+                & (self.x < CAR_X + CAR_WIDTH)
+                & (self.x + sizes > CAR_X))
+        expired = moving & ~hits & (self.x < EXPIRE_X)
+
+        # The game checks obstacles in spawn order and stops at the first hit,
+        # so only obstacles older than that one get scored.
+        last_seq = np.iinfo(np.int64).max
+        first_hit = np.where(hits, self.seq, last_seq).min(axis=1)
+        scored = expired & (self.seq < first_hit[:, None])
+        self.score += OBSTACLE_POINTS * scored.sum(axis=1)
+        self.active &= ~scored
+
+        # Record the crashes and what caused them.
+        crashed = hits.any(axis=1)
+        races = np.flatnonzero(crashed)
+        slots = (self.seq[races] == first_hit[races, None]).argmax(axis=1)
+        self.crash_cause[races] = self.kind[races, slots]
+        self.crashed |= crashed
+
+    def grow(self):
+        """Double the number of obstacle slots per race."""
+        extra = self.active.shape[1]
+        pad = ((0, 0), (0, extra))
+        self.active = np.pad(self.active, pad)
+        self.kind = np.pad(self.kind, pad)
+        self.lane = np.pad(self.lane, pad)
+        self.x = np.pad(self.x, pad)
+        self.seq = np.pad(self.seq, pad)
+
+
+def run_batch(n, seed=None, max_frames=None, policy=None):
+    """Run n races until they all crash and return the finished BatchRace.
+
+    policy, if given, is called with the BatchRace before every step and
+    returns an array of actions.
+    """
+    batch = BatchRace(n, seed)
+    frames = 0
+    while not batch.crashed.all():
+        if max_frames is not None and frames >= max_frames:
+            break
+        batch.step(policy(batch) if policy is not None else None)
+        frames += 1
+    return batch
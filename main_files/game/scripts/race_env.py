@@ -0,0 +1,129 @@
+"""Gym-style reinforcement learning environments for Speed Racer.
+
+RaceEnv wraps a single race_sim.RaceState and VectorRaceEnv steps many races
+at once on top of race_batch.BatchRace. Both follow the Gymnasium API:
+reset(seed) returns (observation, info) and step(action) returns
+(observation, reward, terminated, truncated, info).
+
+An observation is a float32 array of five numbers: the car's lane, the x
+position of the nearest obstacle in lanes 1, 2 and 3 (TRACKWIDTH when the
+lane is clear) and the game speed. Actions are indexes into ACTION_MAP and
+the reward is the points scored during the step.
+"""
+
+import numpy as np
+
+from race_sim import (UP, DOWN, NONE, LANES, TRACKWIDTH, CAR_X, OBSTACLES,
+                      RaceState, nearest_obstacles)
+from race_batch import BatchRace, OBSTACLE_SIZE_TABLE, NO_CAUSE
+
+# Discrete action indexes and the race actions they stand for.
+ACTION_MAP = [NONE, UP, DOWN]
+ACTION_COUNT = len(ACTION_MAP)
+
+# Length of an observation.
+OBSERVATION_SIZE = 2 + len(LANES)
+
+
+def observe(state):
+    """Return the observation of a single RaceState."""
+    nearest = nearest_obstacles(state)
+    obs = np.empty(OBSERVATION_SIZE, dtype=np.float32)
+    obs[0] = state.car_lane
+    for i, lane in enumerate(LANES):
+        obs[1 + i] = TRACKWIDTH if nearest[lane] is None else nearest[lane]
+    obs[-1] = state.game_speed
+    return obs
+
+
+def observe_batch(batch):
+    """Return the stacked observations of every race in a BatchRace."""
+    obs = np.empty((batch.n, OBSERVATION_SIZE), dtype=np.float32)
+    obs[:, 0] = batch.car_lane
+
+    # Only obstacles that have not fully passed the car count.
+    ahead = batch.active & (batch.x + OBSTACLE_SIZE_TABLE[batch.kind] > CAR_X)
+    for i, lane in enumerate(LANES):
+        in_lane = ahead & (batch.lane == lane)
+        obs[:, 1 + i] = np.where(in_lane, batch.x, TRACKWIDTH).min(axis=1)
+
+    obs[:, -1] = batch.game_speed
+    return obs
+
+
+class RaceEnv:
+    """A single race as a reinforcement learning environment."""
+
+    def __init__(self, max_frames=None):
+        """Set up the environment. Races longer than max_frames are cut off."""
+        self.max_frames = max_frames
+        self.state = None
+
+    def reset(self, seed=None):
+        """Start a new race and return its first observation and info."""
+        self.state = RaceState(seed)
+        return observe(self.state), {}
+
+    def step(self, action):
+        """Take an action for one frame."""
+        state = self.state
+        score = state.score
+
+        terminated = state.step(ACTION_MAP[action])
+        truncated = (not terminated and self.max_frames is not None
+                     and state.pace >= self.max_frames)
+        info = {
+            'score': state.score,
+            'pace': state.pace,
+            'crash_cause': state.crash_cause,
+        }
+        return (observe(state), state.score - score, terminated, truncated,
+                info)
+
+
+class VectorRaceEnv:
+    """Many races stepped together, returning stacked NumPy arrays.
+
+    Races that end are restarted straight away. Their final score, pace and
+    crash cause are reported in the info arrays of the step they ended on.
+    """
+
+    def __init__(self, n, max_frames=None):
+        """Set up n races. Races longer than max_frames are cut off."""
+        self.n = n
+        self.max_frames = max_frames
+        self.batch = None
+
+    def reset(self, seed=None):
+        """Start n new races and return their observations and info."""
+        self.batch = BatchRace(self.n, seed)
+        return observe_batch(self.batch), {}
+
+    def step(self, actions):
+        """Take one action per race for one frame."""
+        batch = self.batch
+        score = batch.score.copy()
+
+        terminated = batch.step(np.take(ACTION_MAP, actions)).copy()
+        rewards = (batch.score - score).astype(np.float32)
+        if self.max_frames is not None:
+            truncated = ~terminated & (batch.pace >= self.max_frames)
+        else:
+            truncated = np.zeros(self.n, dtype=bool)
+
+        # Report how the finished races ended, then start them again.
+        done = terminated | truncated
+        info = {
+            'final_score': np.where(done, batch.score, 0),
+            'final_pace': np.where(done, batch.pace, 0),
+            'crash_cause': np.where(terminated, batch.crash_cause, NO_CAUSE),
+        }
+        if done.any():
+            batch.reset(done)
+
+        return observe_batch(batch), rewards, terminated, truncated, info
+
+
+def crash_cause_name(cause):
+    """Return the obstacle name for a crash_cause index, or None."""
+    return None if cause == NO_CAUSE else OBSTACLES[cause]
@@ -0,0 +1,340 @@
+"""Headless simulation core for Speed Racer. A RaceState holds everything
+about one race and advances it a frame at a time with step(). It never
+touches the display or the clock, so races can be simulated as fast as the
+CPU allows and the game itself only has to render the state."""
+
+import random
+from collections import deque
+from itertools import chain
+
+# Set up the track constants. These match the window layout of the game.
+CENTERY = 300
+TRACKWIDTH = 900
+
+# Set up the lane constants. Lane 3 is the top lane and lane 1 the bottom.
+TOP_LANE = 3
+MIDDLE_LANE = 2
+BOTTOM_LANE = 1
+LANES = [BOTTOM_LANE, MIDDLE_LANE, TOP_LANE]
+LANE_OFFSET = 160
+
+# Set the action constants.
+UP = 1
+NONE = 0
+DOWN = -1
+ACTIONS = [UP, NONE, DOWN]
+
+# Set the car constants.
+CAR_WIDTH = 300
+CAR_HEIGHT = 100
+CAR_X = 80
+
+# Set how many frames the car takes to slide to a new lane. This is only how
+# it is drawn. Collisions always use the lane the car is changing to.
+LANE_CHANGE_FRAMES = 4
+
+# Set arrow constants.
+ARROWSPAWNRATE = 60
+ARROW_SIZE = 90
+
+# Set obstacle constants.
+ROCK = 'rock'
+BARREL = 'barrel'
+OIL = 'oil'
+OBSTACLES = [ROCK, BARREL, OIL]
+OBSTACLE_SIZES = {ROCK: 75, BARREL: 100, OIL: 130}
+
+# Anything that moves left of this x position is off the track.
+EXPIRE_X = 75
+
+# Set the difficulty constants.
+START_SPEED = 7
+SPEED_INCREASE = 2
+SPEED_INTERVAL = 500
+START_OBSTACLE_SPAWN = 80
+OBSTACLE_POINTS = 10
+
+# Race seeds are unsigned numbers of this many bits.
+SEED_BITS = 64
+
+
+def new_seed():
+    """Return a fresh random race seed."""
+    return random.SystemRandom().getrandbits(SEED_BITS)
+
+
+def lane_y(lane):
+    """Return the center y position of a lane."""
+    return CENTERY + (MIDDLE_LANE - lane) * LANE_OFFSET
+
+
+class Obstacle:
+    """An obstacle on the track. Obstacles are reused once they expire, so
+    every attribute is set again by place()."""
+
+    __slots__ = ('kind', 'lane', 'track_x', 'y', 'size', 'number')
+
+    def place(self, kind, lane, track_x, number):
+        """Put the obstacle on the track."""
+        self.kind = kind
+        self.lane = lane
+        self.size = OBSTACLE_SIZES[kind]
+        self.track_x = track_x
+        self.y = lane_y(lane) - self.size // 2
+        self.number = number
+        return self
+
+
+class RaceState:
+    """The complete state of a single race.
+
+    Everything on the track moves left at the same speed, so instead of
+    moving each arrow and obstacle every frame the race keeps the total
+    distance scrolled and stores their positions along the track. An
+    object's x on the screen is its track position minus the distance.
+    Obstacles are kept in one deque per lane ordered by x, so a collision
+    check only looks at the front of the car's lane and expired obstacles
+    are popped off the left. Popped obstacles go on a free list and are
+    reused for the next spawns, so a running race allocates next to
+    nothing per frame.
+
+    Lane changes happen at once for collisions, but the car is drawn
+    sliding from where it was to the new lane over LANE_CHANGE_FRAMES
+    frames, so the tween never changes how a race plays out.
+    """
+
+    def __init__(self, seed=None):
+        """Set up a new race. Races with the same seed and inputs play out
+        the same. Without a seed a random one is picked."""
+        if seed is None:
+            seed = new_seed()
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # Reset game variables.
+        self.score = 0
+        self.car_lane = MIDDLE_LANE
+        self.lane_change_y = lane_y(MIDDLE_LANE)
+        self.lane_change_pace = -LANE_CHANGE_FRAMES
+        self.distance = 0
+        self.arrows = deque()
+        self.arrow_frame = 0
+        self.lanes = {lane: deque() for lane in LANES}
+        self.free_obstacles = []
+        self.obstacle_frame = 0
+        self.obstacle_count = 0
+        self.game_speed = START_SPEED
+        self.obstacle_spawn = START_OBSTACLE_SPAWN
+        self.pace = 0
+
+        # Remember what ended the race.
+        self.crashed = False
+        self.crash_cause = None
+
+        # Record every input as (frame, action) so the race can be replayed.
+        self.inputs = []
+
+    @property
+    def obstacles(self):
+        """Return an iterator over every obstacle on the track."""
+        return chain.from_iterable(self.lanes.values())
+
+    def obstacle_x(self, obstacle):
+        """Return the x position of an obstacle on the screen."""
+        return obstacle.track_x - self.distance
+
+    def arrow_positions(self):
+        """Return the x positions of the arrow columns on the screen."""
+        distance = self.distance
+        return (track_x - distance for track_x in self.arrows)
+
+    @property
+    def car_y(self):
+        """Return the top y position of the car."""
+        return self.car_y_at()
+
+    def car_y_at(self, lag=0.0):
+        """Return the top y position the car is drawn at lag frames before
+        the current one, part of the way through any lane change."""
+        return round(self.car_center_y(lag)) - CAR_HEIGHT // 2
+
+    def car_center_y(self, lag=0.0):
+        """Return the center y position of the car lag frames before the
+        current one."""
+        frames = self.pace - self.lane_change_pace - lag
+        progress = min(max(frames / LANE_CHANGE_FRAMES, 0.0), 1.0)
+
+        # Ease in and out of the lane change.
+        progress = progress * progress * (3 - 2 * progress)
+        start_y = self.lane_change_y
+        return start_y + (lane_y(self.car_lane) - start_y) * progress
+
+    def step(self, action=NONE):
+        """Advance the race by one frame and return True if the car crashed."""
+        if self.crashed:
+            return True
+
+        # Move the car first, just like the game handles events first.
+        if action != NONE:
+            self.inputs.append((self.pace, action))
+            self.move_car(action)
+
+        # Increase the game pace.
+        self.pace += 1
+
+        self.update_speed()
+
+        # Everything spawns first and then moves, just like the game loop.
+        self.spawn_arrows()
+        self.spawn_obstacles()
+        self.distance += self.game_speed
+        self.update_arrows()
+        self.crashed = self.update_obstacles()
+        return self.crashed
+
+    def move_car(self, action):
+        """Move the car up or down a lane if it can go there."""
+        if action == UP and self.car_lane != TOP_LANE:
+            lane = self.car_lane + 1
+        elif action == DOWN and self.car_lane != BOTTOM_LANE:
+            lane = self.car_lane - 1
+        else:
+            return
+
+        # Slide from wherever the car is drawn now, even mid lane change.
+        self.lane_change_y = self.car_center_y()
+        self.lane_change_pace = self.pace
+        self.car_lane = lane
+
+    def update_speed(self):
+        """Make the game faster every SPEED_INTERVAL frames."""
+        if self.pace % SPEED_INTERVAL == 0:
+            self.game_speed += SPEED_INCREASE
+
+    def spawn_arrows(self):
+        """Spawn a column of arrows if the time is right."""
+        if self.arrow_frame >= ARROWSPAWNRATE:
+            # Reset the arrow frame. All three arrows share an x position.
+            self.arrow_frame = 0
+            self.arrows.append(TRACKWIDTH - ARROW_SIZE // 2 + self.distance)
+        else:
+            self.arrow_frame += 1
+
+    def update_arrows(self):
+        """Drop the arrows that left the track."""
+        expire = EXPIRE_X + self.distance
+        while self.arrows and self.arrows[0] < expire:
+            self.arrows.popleft()
+
+    def spawn_obstacles(self):
+        """Spawn obstacles at shrinking intervals."""
+        if self.obstacle_frame < self.obstacle_spawn:
+            self.obstacle_frame += 1
+            return
+
+        # Reset the obstacle frame.
+        self.obstacle_frame = 0
+        self.obstacle_spawn -= 1
+
+        # Choose a random obstacle to spawn.
+        kind = self.rng.choice(OBSTACLES)
+
+        # Set the obstacle's lane. 50% Chance it targets the car.
+        if self.rng.randint(1, 2) == 1:
+            lane = self.rng.randint(1, 3)
+        else:
+            lane = self.car_lane
+
+        # Center the obstacle at the end of the track in its lane, reusing
+        # an expired obstacle if there is one. The spawn number keeps the
+        # order the game checks obstacles in.
+        track_x = TRACKWIDTH - OBSTACLE_SIZES[kind] // 2 + self.distance
+        if self.free_obstacles:
+            obstacle = self.free_obstacles.pop()
+        else:
+            obstacle = Obstacle()
+        obstacle.place(kind, lane, track_x, self.obstacle_count)
+        self.obstacle_count += 1
+
+        # Keep the lane ordered by x. A smaller obstacle spawned right after
+        # a bigger one can start further left, so it is not always last.
+        obstacles = self.lanes[lane]
+        index = len(obstacles)
+        while index and obstacles[index - 1].track_x > track_x:
+            index -= 1
+        if index == len(obstacles):
+            obstacles.append(obstacle)
+        else:
+            obstacles.insert(index, obstacle)
+
+    def update_obstacles(self):
+        """Score the obstacles that left the track and return True if one
+        hit the car."""
+        hit = self.find_hit()
+        expire = EXPIRE_X + self.distance
+
+        if hit is not None:
+            # The game checks obstacles in spawn order and stops at the one
+            # that hit, so only older obstacles that left the track score.
+            for obstacles in self.lanes.values():
+                for obstacle in obstacles:
+                    if obstacle.track_x >= expire:
+                        break
+                    if obstacle.number < hit.number:
+                        self.score += OBSTACLE_POINTS
+
+            self.crash_cause = hit.kind
+            return True
+
+        # Remove the obstacles that left the track and give the player
+        # points. The removed obstacles are kept for reuse.
+        for obstacles in self.lanes.values():
+            while obstacles and obstacles[0].track_x < expire:
+                self.free_obstacles.append(obstacles.popleft())
+                self.score += OBSTACLE_POINTS
+
+        return False
+
+    def find_hit(self):
+        """Return the oldest obstacle overlapping the car, or None.
+
+        The lanes are further apart than any obstacle is tall, so only
+        obstacles in the car's lane can hit it, and they are ordered by x,
+        so the search stops at the first one past the car's front.
+        """
+        hit = None
+        for obstacle in self.lanes[self.car_lane]:
+            x = obstacle.track_x - self.distance
+            if x >= CAR_X + CAR_WIDTH:
+                break
+            if x + obstacle.size > CAR_X:
+                if hit is None or obstacle.number < hit.number:
+                    hit = obstacle
+        return hit
+
+
+def nearest_obstacles(state):
+    """Return the x position of the nearest obstacle ahead of the car's back
+    in each lane, or None for lanes with nothing coming."""
+    nearest = {lane: None for lane in LANES}
+    for lane in LANES:
+        for obstacle in state.lanes[lane]:
+            x = state.obstacle_x(obstacle)
+            if x + obstacle.size > CAR_X:
+                nearest[lane] = x
+                break
+    return nearest
+
+
+def run_race(policy, seed=None, max_frames=None):
+    """Run a whole race headlessly and return the finished RaceState.
+
+    The policy is called with the state before every frame and returns UP,
+    DOWN or NONE.
+    """
+    state = RaceState(seed)
+    while not state.crashed:
+        if max_frames is not None and state.pace >= max_frames:
+            break
+        state.step(policy(state))
+    return state
@@ -0,0 +1,167 @@
+"""Compact replays for Speed Racer. A race is fully decided by its seed and
+the frames the player changed lanes on, so a replay only stores those and
+plays the race back through race_sim without drawing anything.
+
+The binary format is a fixed header followed by the inputs:
+
+    magic     4 bytes   b'SRRP'
+    version   1 byte
+    seed      8 bytes   unsigned, little endian
+    frames    4 bytes   number of frames the race lasted
+    score     4 bytes   score the race ended with
+    count     varint    number of inputs
+    inputs    varints   (frames since the previous input << 1) | up
+
+so a typical race takes a few dozen bytes.
+
+Run this script with a replay file to play it back and check its score.
+"""
+
+import struct, sys
+from pathlib import Path
+
+from race_sim import UP, DOWN, NONE, RaceState
+
+MAGIC = b'SRRP'
+VERSION = 1
+HEADER = struct.Struct('<4sBQII')
+
+
+class Replay:
+    """A recorded race: its seed, inputs, length and final score."""
+
+    def __init__(self, seed, inputs, frames, score):
+        """Set up a replay. inputs is a list of (frame, action) pairs."""
+        self.seed = seed
+        self.inputs = inputs
+        self.frames = frames
+        self.score = score
+
+    @classmethod
+    def from_race(cls, race):
+        """Record a replay of a finished RaceState."""
+        return cls(race.seed, list(race.inputs), race.pace, race.score)
+
+    def to_bytes(self):
+        """Encode the replay in the binary replay format."""
+        data = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, self.frames,
+                                     self.score))
+        write_varint(data, len(self.inputs))
+
+        last_frame = 0
+        for frame, action in self.inputs:
+            write_varint(data, (frame - last_frame) << 1 | (action == UP))
+            last_frame = frame
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decode a replay, raising ValueError if the data is not one."""
+        if len(data) < HEADER.size:
+            raise ValueError('Replay is too short.')
+
+        magic, version, seed, frames, score = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('Not a Speed Racer replay.')
+        if version != VERSION:
+            raise ValueError(f'Unsupported replay version {version}.')
+
+        count, pos = read_varint(data, HEADER.size)
+        inputs = []
+        frame = 0
+        for _ in range(count):
+            value, pos = read_varint(data, pos)
+            frame += value >> 1
+            inputs.append((frame, UP if value & 1 else DOWN))
+
+        if pos != len(data):
+            raise ValueError('Replay has trailing data.')
+        return cls(seed, inputs, frames, score)
+
+    def play(self, max_frames=None):
+        """Fast-forward through the race headlessly and return the final
+        RaceState. Stops after max_frames frames if given."""
+        state = RaceState(self.seed)
+        inputs = iter(self.inputs)
+        next_input = next(inputs, None)
+        limit = self.frames if max_frames is None else min(self.frames,
+                                                           max_frames)
+
+        while state.pace < limit and not state.crashed:
+            action = NONE
+            if next_input is not None and next_input[0] == state.pace:
+                action = next_input[1]
+                next_input = next(inputs, None)
+            state.step(action)
+        return state
+
+    def verify(self, max_frames=None):
+        """Play the replay back and return True if it really ends with its
+        recorded score after its recorded number of frames."""
+        state = self.play(max_frames)
+        return (state.crashed and state.pace == self.frames
+                and state.score == self.score)
+
+
+def check_replay(data, max_frames=None):
+    """Decode raw replay bytes, play them back and report the result.
+
+    Returns a dict saying whether the replay is valid, with the score and
+    frames it claims and the ones the playback really reached. This is
+    meant to run in worker processes, so it takes and returns plain data.
+    """
+    try:
+        replay = Replay.from_bytes(data)
+    except ValueError as error:
+        return {'valid': False, 'error': str(error)}
+
+    state = replay.play(max_frames)
+    return {
+        'valid': (state.crashed and state.pace == replay.frames
+                  and state.score == replay.score),
+        'seed': replay.seed,
+        'claimed_score': replay.score,
+        'claimed_frames': replay.frames,
+        'score': state.score,
+        'frames': state.pace,
+    }
+
+
+def write_varint(data, value):
+    """Append an unsigned number to a bytearray, 7 bits per byte."""
+    while value >= 0x80:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def read_varint(data, pos):
+    """Read an unsigned number at pos and return it with the next pos."""
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError('Replay ends in the middle of a number.')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def save_replay(path, replay):
+    """Write a replay to a file."""
+    Path(path).write_bytes(replay.to_bytes())
+
+
+def load_replay(path):
+    """Read a replay from a file."""
+    return Replay.from_bytes(Path(path).read_bytes())
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:]:
+        replay = load_replay(path)
+        result = 'OK' if replay.verify() else 'MISMATCH'
+        print(f'{path}: seed {replay.seed}, {replay.frames} frames, '
+              f'{len(replay.inputs)} inputs, score {replay.score}: {result}')
@@ -0,0 +1,159 @@
+"""Score submission for Speed Racer. The game hands finished races to a
+ScoreClient, which posts them to the leaderboard from a background thread,
+so the game never waits on the network.
+
+Every score waiting to be sent is kept in a spool file, so scores from
+races played offline, or when the game closes mid submission, are sent the
+next time the game runs. Everything waiting goes in one request, and failed
+requests are tried again after a growing, randomized delay.
+
+The server can be set with the SPEED_RACER_SERVER environment variable, or
+turned off by setting it to nothing."""
+
+import base64, json, os, random, secrets, time, urllib.error, urllib.request
+from pathlib import Path
+from queue import Queue, Empty
+from threading import Thread
+
+SERVER_URL = os.environ.get('SPEED_RACER_SERVER',
+                            'https://speedracer.pythonanywhere.com')
+
+# The server takes at most this many scores per request.
+MAX_BATCH = 20
+
+# Retry delays in seconds, and how long to wait on the server.
+FIRST_RETRY = 2
+MAX_RETRY = 300
+REQUEST_TIMEOUT = 10
+
+
+class ScoreClient:
+    """Sends scores to the leaderboard in the background."""
+
+    def __init__(self, server_url, spool_path, name_path):
+        """Set up a client posting to server_url. Waiting scores are kept in
+        spool_path, and the player's name is kept in name_path."""
+        self.url = server_url.rstrip('/') + '/leaderboard'
+        self.spool_path = Path(spool_path)
+        self.name_path = Path(name_path)
+        self.queue = Queue()
+        self.pending = []
+        self.results = {}
+        self.thread = None
+        self.retry_delay = FIRST_RETRY
+
+    def start(self):
+        """Start sending scores in the background."""
+        if self.thread is None:
+            self.thread = Thread(target=self.run, name='score client',
+                                 daemon=True)
+            self.thread.start()
+
+    def submit(self, score, replay=b''):
+        """Queue a score and its replay to be sent, and return an id to
+        look up the result with. This never blocks."""
+        submission_id = secrets.token_hex(8)
+        self.queue.put({'id': submission_id, 'score': score,
+                        'replay': base64.b64encode(replay).decode('ascii')})
+        return submission_id
+
+    def result(self, submission_id):
+        """Return the server's answer for a submission, or None if there
+        isn't one yet. Accepted scores come with the player's rank."""
+        return self.results.get(submission_id)
+
+    def run(self):
+        """Send scores until the game closes. This runs on the client's
+        thread."""
+        player = self.load_name()
+        self.pending = self.load_spool()
+        retry_time = time.monotonic()
+
+        while True:
+            # Wait for a new score, or until the next retry is due.
+            timeout = None
+            if self.pending:
+                timeout = max(retry_time - time.monotonic(), 0)
+            try:
+                submission = self.queue.get(timeout=timeout)
+            except Empty:
+                pass
+            else:
+                self.add_pending(submission, player)
+                while not self.queue.empty():
+                    self.add_pending(self.queue.get(), player)
+                self.save_spool()
+                if time.monotonic() < retry_time:
+                    continue
+
+            if self.pending and not self.send_batch():
+                # Wait longer after every failure, at random so many games
+                # don't all retry at once when the server comes back.
+                retry_time = (time.monotonic()
+                              + self.retry_delay * random.uniform(0.5, 1))
+                self.retry_delay = min(self.retry_delay * 2, MAX_RETRY)
+            else:
+                self.retry_delay = FIRST_RETRY
+
+    def add_pending(self, submission, player):
+        """Add a queued submission to the ones waiting to be sent."""
+        submission['player'] = player
+        self.pending.append(submission)
+
+    def send_batch(self):
+        """Post the oldest waiting scores. Returns False if the server
+        couldn't be reached, so they should be sent again later."""
+        batch = self.pending[:MAX_BATCH]
+        body = json.dumps({'scores': [
+            {key: submission[key] for key in ('player', 'score', 'replay')}
+            for submission in batch]}).encode('UTF-8')
+        request = urllib.request.Request(
+            self.url, body, {'Content-Type': 'application/json'})
+
+        try:
+            with urllib.request.urlopen(request,
+                                        timeout=REQUEST_TIMEOUT) as response:
+                results = json.load(response)['results']
+        except urllib.error.HTTPError as error:
+            # The server turned the whole batch down, so don't send it again.
+            if error.code >= 500:
+                return False
+            results = [{'accepted': False, 'error': f'HTTP {error.code}'}
+                       for _ in batch]
+        except (OSError, ValueError, KeyError):
+            return False
+
+        for submission, result in zip(batch, results):
+            self.results[submission['id']] = result
+        del self.pending[:len(batch)]
+        self.save_spool()
+        return True
+
+    def load_name(self):
+        """Return the player's name, making one up the first time."""
+        try:
+            return self.name_path.read_text(encoding='UTF-8').strip()
+        except OSError:
+            name = f'Racer {secrets.token_hex(3)}'
+            try:
+                self.name_path.write_text(name, encoding='UTF-8')
+            except OSError:
+                pass
+            return name
+
+    def load_spool(self):
+        """Return the scores left waiting by earlier runs."""
+        try:
+            return json.loads(self.spool_path.read_text(encoding='UTF-8'))
+        except (OSError, ValueError):
+            return []
+
+    def save_spool(self):
+        """Write the waiting scores to the spool file. It is written to a
+        temporary file first, so a crash never leaves half a spool."""
+        temp_path = self.spool_path.with_suffix('.tmp')
+        try:
+            temp_path.write_text(json.dumps(self.pending), encoding='UTF-8')
+            os.replace(temp_path, self.spool_path)
+        except OSError:
+            pass
@@ -0,0 +1,911 @@
+"""Main code for Speed Racer. Speed Racer is a classic 2d racing game
+where you can switch what lane you're in to avoid obstacles."""
+
+import time
+
+# Remember when the game started, to report the time to the first frame.
+START_TIME = time.perf_counter()
+
+import pygame, sys, os
+from pygame.locals import *
+from pathlib import Path
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from webbrowser import open 
+from race_sim import (RaceState, UP, DOWN, NONE, LANES, CAR_X, ARROW_SIZE,
+                      ROCK, BARREL, OIL, lane_y)
+from assets import load_image, read_image, convert_image, build_atlas
+from replay import Replay, save_replay
+from profiler import FrameProfiler
+from audio import AudioManager
+from score_client import ScoreClient, SERVER_URL
+
+# Set up window constants.
+WINDOWWIDTH = 1000
+WINDOWHEIGHT = 600
+TRACKWIDTH = 900
+TRACKHEIGHT = 500
+CENTERX = WINDOWWIDTH / 2
+CENTERY = WINDOWHEIGHT / 2
+
+# Define a constant for the folder the game is unzipped to, relative to
+# where it runs from. Bundles for each platform set this when they are built.
+GAME_PATH = 'downloads/speed_racer'
+
+# Define a constant for the path of the player's personal best (PB)
+PB_PATH = Path(GAME_PATH, 'game_data', 'personal_best.txt')
+
+# Define a constant for the path of the last run's replay.
+REPLAY_PATH = Path(GAME_PATH, 'game_data', 'last_replay.srr')
+
+# Define a constant for the folder holding the game's images.
+IMAGES_PATH = Path(GAME_PATH, 'images')
+
+# The images only needed once a race starts. They load in the background
+# while the title screen is up.
+GAME_IMAGES = ['race_track.png', 'car.png', 'arrow.png', 'rock.png',
+               'barrel.png', 'oil.png']
+
+# Set up the game's audio. Decoded music is cached with the game data.
+MUSIC = 'chaoz_impact.mp3'
+GAME_OVER_SOUND = 'game_over.wav'
+audio = AudioManager(Path(GAME_PATH, 'sounds'), Path(GAME_PATH, 'game_data'))
+
+# Set up the leaderboard client. Scores waiting to be sent and the player's
+# leaderboard name are kept with the game data.
+score_client = ScoreClient(SERVER_URL,
+                           Path(GAME_PATH, 'game_data', 'score_spool.json'),
+                           Path(GAME_PATH, 'game_data', 'player_name.txt'))
+score_submission = None
+
+# Set how long the game took to show its first frame, once it has.
+first_frame_time = None
+
+# Color constants.
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+LIGHTGRAY = (200, 200, 200)
+LIGHTRED = (255, 0, 0)
+RED = (255, 0 , 0)
+LIGHTGREEN = (0, 255, 0)
+GREEN = (0, 255, 0)
+DARKGREEN = (0, 100, 0)
+LIGHTBLUE = (0, 0, 255)
+BLUE = (0, 0, 255)
+LIGHTYELLOW = (255, 255, 0)
+YELLOW = (255, 255, 0)
+LIGHTORANGE = (255, 165, 0)
+ORANGE = (255, 165, 0)
+LIGHTPURPLE = (255, 0, 255)
+PURPLE = (255, 0, 255)
+LIGHTPINK = (255, 192, 203)
+PINK = (255, 192, 203)
+LIGHTBROWN = (139, 69, 19)
+BROWN = (139, 69, 19)
+LIGHTCYAN = (0, 255, 255)
+CYAN = (0, 255, 255)
+BG_COLOR = LIGHTGRAY
+
+# Set the atlas name of the arrow image. Obstacles use their kinds.
+ARROW = 'arrow'
+
+# Set up the timing constants. The race is always simulated SIM_RATE steps
+# per second. FPS only caps how often the screen is drawn, and can be set
+# with the SPEED_RACER_FPS environment variable, e.g. to 144 for high
+# refresh screens or 0 for no cap at all.
+SIM_RATE = 60
+STEP_TIME = 1 / SIM_RATE
+MAX_FRAME_TIME = 0.25
+FPS = int(os.environ.get('SPEED_RACER_FPS', 60))
+
+# The title and game over screens only wait for the player, so they are
+# checked at a fixed rate whatever FPS is.
+MENU_FPS = 60
+
+# Set up the font and text caches. Fonts are kept by size and rendered text
+# surfaces by their text, size and colors, least recently used first.
+TEXT_CACHE_SIZE = 64
+fonts = {}
+text_cache = OrderedDict()
+
+# Set up the dirty rectangle lists. Only these parts of the screen are
+# pushed to the display during the game.
+EXPOSE_EVENTS = (VIDEOEXPOSE, WINDOWEXPOSED)
+dirty_rects = []
+sprite_rects = []
+hud_text = {}
+full_update = False
+
+# Set up the frame profiler. F3 shows its overlay during a race, and if the
+# SPEED_RACER_PROFILE environment variable names a .csv or .json file, the
+# timings are written to it when the game closes.
+PROFILER_REFRESH = 30
+PROFILE_PATH = os.environ.get('SPEED_RACER_PROFILE')
+profiler = FrameProfiler()
+show_profiler = False
+profiler_lines = []
+
+# Set up the input queue. Key presses are queued as (time read, action) and
+# go into the simulation one per step, oldest first. Presses are also read
+# while waiting for the next frame, so their times are accurate to well
+# under a frame. Steps that took a press keep its time until the frame
+# showing it is sent to the display, to measure the input latency.
+input_queue = deque()
+shown_inputs = []
+
+def main():
+    """Run the overall script."""
+    global DISPLAYSURF, MAINCLOCK
+
+    # Initialize only the parts of pygame the game uses and set up a clock.
+    # The mixer starts on the loading thread.
+    pygame.display.init()
+    pygame.font.init()
+    MAINCLOCK = pygame.time.Clock()
+
+    # Set up the window.
+    DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
+    pygame.display.set_caption("Speed Racer")
+
+    # Load in what the title screen needs, and the rest in the background.
+    load_title_assets()
+    start_loading_assets()
+
+    # Load the pb into memory once. This creates the pb file if needed.
+    load_pb()
+
+    # Start sending scores to the leaderboard, unless it is turned off.
+    if SERVER_URL:
+        score_client.start()
+
+    # Run the title screen, then make sure everything else is loaded.
+    title_screen()
+    finish_loading_assets()
+
+    # Run the main game loop.
+    while True:
+        score = run_game()
+        game_over(score)
+
+
+def title_screen():
+    """Run the game's title screen."""
+
+    # Set up the title screen fonts.
+    titlefont = create_font(100)
+    smallfont = create_font(40)
+    buttonfont = create_font(75)
+
+    # Set up the title screen text.
+    titletext = titlefont.render('Speed Racer', False, RED, WHITE)
+    titlerect = titletext.get_rect()
+    titlerect.center = (CENTERX, CENTERY - 200)
+
+    # Set up the credits text.
+    bytext = smallfont.render('By Collin Maryniak', False, BLACK, WHITE)
+    byrect = bytext.get_rect()
+    byrect.center = (CENTERX, CENTERY - 100)
+
+    # Set up the GitHub text.
+    gitsurf = smallfont.render("Visit this game's GitHub page below.", False,
+                               BLACK, WHITE)
+    gitrect = gitsurf.get_rect()
+    gitrect.center = (CENTERX, CENTERY)
+
+    # Set up the buttons.
+    gitbutton = pygame.Rect(0, 0, 300, 100)
+    gitbutton.center = (CENTERX - 200, CENTERY + 100)
+
+    startbutton = pygame.Rect(0, 0, 300, 100)
+    startbutton.center = (CENTERX + 200, CENTERY + 100)
+
+    # Add the text to go on top of the github button.
+    gittext = buttonfont.render('GitHub', False, PURPLE)
+    gittextrect = gittext.get_rect()
+    gittextrect.center = gitbutton.center
+
+    # Add the text to go on top of the start button.
+    starttext = buttonfont.render('Start', False, GREEN)
+    starttextrect = starttext.get_rect()
+    starttextrect.center = startbutton.center
+
+    # Load in the instructions.
+    path = Path(GAME_PATH, 'game_data', 'instructions.txt')
+    instructions = path.read_text(encoding='UTF-8')
+    instruc_lines = instructions.splitlines()
+    instruc1 = instruc_lines[0]
+    instruc2 = instruc_lines[1]
+    instruc1.strip()
+    instruc2.strip()
+
+    # Create the instructions text.
+    instrucsurf1 = smallfont.render(instruc1, False, RED, WHITE)
+    instrucrect1 = instrucsurf1.get_rect()
+    instrucrect1.center = (CENTERX, CENTERY + 200)
+
+    instrucsurf2 = smallfont.render(instruc2, False, RED, WHITE)
+    instrucrect2 = instrucsurf1.get_rect()
+    instrucrect2.center = (CENTERX - 40, CENTERY + 235)
+
+    # Blit the title screen background.
+    DISPLAYSURF.blit(title_img, (0, 0))
+
+    # Draw the buttons.
+    pygame.draw.rect(DISPLAYSURF, BLACK, gitbutton)
+    pygame.draw.rect(DISPLAYSURF, BLACK, startbutton)
+
+    # Draw the text that goes on top of the buttons.
+    DISPLAYSURF.blit(gittext, gittextrect)
+    DISPLAYSURF.blit(starttext, starttextrect)
+
+    # Draw the other text.
+    DISPLAYSURF.blit(titletext, titlerect)
+    DISPLAYSURF.blit(bytext, byrect)
+    DISPLAYSURF.blit(gitsurf, gitrect)
+    DISPLAYSURF.blit(instrucsurf1, instrucrect1)
+    DISPLAYSURF.blit(instrucsurf2, instrucrect2)
+
+    # Nothing on the title screen moves, so it is only shown once and again
+    # whenever the window gets uncovered.
+    show = True
+
+    # Run the title screen loop.
+    while True:
+        # Check for events.
+        for event in pygame.event.get():
+            # Check for quit.
+            if event.type == QUIT:
+                terminate()
+
+            # Check if the window needs to be shown again.
+            if event.type in EXPOSE_EVENTS:
+                show = True
+
+            # Check if the player is pressing a key.
+            if event.type == KEYDOWN:
+                # Check for ESCAPE key.
+                if event.key == K_ESCAPE:
+                    terminate()
+
+            # Check if the player is clicking.
+            if event.type == MOUSEBUTTONDOWN:
+                # Check if the player clicked the GitHub button.
+                if gitbutton.collidepoint(event.pos):
+                    # Open Speed Racer GitHub page.
+                    open("https://github.com/OmegaXK/Speed-Racer")
+
+                # Check if the player has clicked the start button.
+                if startbutton.collidepoint(event.pos):
+                    # Start the game by returning.
+                    return
+
+        # Update.
+        if show:
+            pygame.display.update()
+            show = False
+            report_first_frame()
+        MAINCLOCK.tick(MENU_FPS)
+
+
+def report_first_frame():
+    """Print how long the game took to show its first frame, once."""
+    global first_frame_time
+
+    if first_frame_time is None:
+        first_frame_time = time.perf_counter() - START_TIME
+        print(f'Time to first frame: {first_frame_time * 1000:.0f} ms')
+
+
+def run_game():
+    """Run the game, and return when the player hits an obstacle."""
+    global score_submission
+
+    # Start the music.
+    audio.play_music()
+
+    # Set up a fresh race. The race simulation lives in race_sim.
+    race = RaceState()
+
+    # Draw the background once. After this only the parts of the screen that
+    # changed get redrawn and updated.
+    reset_dirty_rects()
+    DISPLAYSURF.blit(background_img, (0, 0))
+    pygame.display.update()
+
+    # The race is simulated in fixed steps of STEP_TIME seconds, no matter
+    # how fast the screen is drawn. Time that has passed but not been
+    # simulated yet is kept in the accumulator.
+    accumulator = 0.0
+    last_time = time.perf_counter()
+    input_queue.clear()
+    shown_inputs.clear()
+
+    # Run the game running loop.
+    while True:
+        frame_start = time.perf_counter()
+        profiler.start_frame()
+
+        # Handle events.
+        for event in pygame.event.get():
+            handle_race_event(event)
+
+        profiler.mark('events')
+
+        # Add the time since the last frame, but never so much at once that
+        # a long stall makes the game fall further and further behind.
+        now = time.perf_counter()
+        accumulator += min(now - last_time, MAX_FRAME_TIME)
+        last_time = now
+
+        # Run every simulation step that is due. Each step takes at most one
+        # key press, and presses stay queued if no step is due yet.
+        while accumulator >= STEP_TIME:
+            accumulator -= STEP_TIME
+            action = NONE
+            if input_queue:
+                press_time, action = input_queue.popleft()
+                shown_inputs.append(press_time)
+            crashed = race.step(action)
+
+            # Check if the player has hit an obstacle.
+            if crashed:
+                # Save a replay of the run and send it to the leaderboard,
+                # then return to the game over screen with the score
+                replay = Replay.from_race(race)
+                save_replay(REPLAY_PATH, replay)
+                score_submission = score_client.submit(race.score,
+                                                       replay.to_bytes())
+                return race.score
+
+        profiler.mark('simulate')
+
+        # Draw the moving things part of the way between the last step and
+        # the next one, so motion stays smooth at any frame rate.
+        offset = round(race.game_speed * (1 - accumulator / STEP_TIME))
+
+        # Draw the game. Start by erasing last frame's sprites.
+        erase_sprites()
+        profiler.mark('erase')
+
+        # Draw the score and the personal best.
+        draw_score(race.score)
+        draw_pb()
+        profiler.mark('text')
+
+        # Draw the arrows and the obstacles in one batch.
+        sprite_batch = []
+        queue_arrows(race, sprite_batch, offset)
+        profiler.mark('arrows')
+        queue_obstacles(race, sprite_batch, offset)
+        profiler.mark('obstacles')
+        draw_sprite_batch(sprite_batch)
+        profiler.mark('blits')
+
+        # Draw the player, part of the way through any lane change.
+        lag = 1 - accumulator / STEP_TIME
+        car_rect.topleft = (CAR_X, race.car_y_at(lag))
+        draw_sprite(car_img, car_rect)
+        profiler.mark('car')
+
+        # Draw the profiler overlay if it is turned on.
+        if show_profiler:
+            draw_profiler_overlay()
+            profiler.mark('overlay')
+
+        # Update the parts of the game that changed, and record how long
+        # the key presses it shows took to get on the screen.
+        update_dirty_rects()
+        now = time.perf_counter()
+        for press_time in shown_inputs:
+            profiler.add_latency(now - press_time)
+        shown_inputs.clear()
+        profiler.mark('update')
+
+        # Wait for the next frame, reading key presses as they come in.
+        wait_for_frame(frame_start)
+        profiler.mark('tick')
+
+
+def handle_race_event(event):
+    """Handle an event during a race. Lane changes go on the input queue."""
+
+    # Check for quit.
+    if event.type == QUIT:
+        terminate()
+
+    # Check if the window needs to be drawn again.
+    if event.type in EXPOSE_EVENTS:
+        redraw_background()
+
+    # Check if the player is pressing a key.
+    if event.type == KEYDOWN:
+
+        # Check if player is pressing escape.
+        if event.key == K_ESCAPE:
+            terminate()
+
+        # Check for arrow keys or WASD, and queue the lane change.
+        if event.key in (K_UP, K_w):
+            input_queue.append((time.perf_counter(), UP))
+
+        elif event.key in (K_DOWN, K_s):
+            input_queue.append((time.perf_counter(), DOWN))
+
+        # Check for F3, and show or hide the profiler overlay.
+        elif event.key == K_F3:
+            toggle_profiler_overlay()
+
+
+def wait_for_frame(frame_start):
+    """Wait until the next frame is due at the FPS cap, handling events as
+    they arrive instead of sleeping through them."""
+    if not FPS:
+        return
+
+    deadline = frame_start + 1 / FPS
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+
+        # Wait whole milliseconds for an event, and spin out the rest.
+        if remaining < 0.001:
+            continue
+        event = pygame.event.wait(int(remaining * 1000))
+        if event.type != NOEVENT:
+            handle_race_event(event)
+
+
+def toggle_profiler_overlay():
+    """Show or hide the profiler overlay."""
+    global show_profiler, profiler_lines
+
+    show_profiler = not show_profiler
+    profiler_lines = []
+
+
+def draw_profiler_overlay():
+    """Draw the frame time summary in the bottom left corner. The numbers
+    are only worked out again every PROFILER_REFRESH frames."""
+    global profiler_lines
+
+    if not profiler_lines or profiler.frame_count % PROFILER_REFRESH == 0:
+        summary = profiler.summary()
+        if summary is None:
+            return
+
+        # Show the three slowest phases after the frame times.
+        phases = summary['phase_ms'].items()
+        slowest = sorted(phases, key=lambda item: -item[1])
+        profiler_lines = [
+            f"FPS {summary['fps']:.0f}  p50 {summary['p50_ms']:.1f} ms  "
+            f"p99 {summary['p99_ms']:.1f} ms",
+            '  '.join(f'{phase} {ms:.2f}' for phase, ms in slowest[:3]),
+        ]
+
+        # Show the input latency once there has been a key press.
+        if summary['input_p50_ms'] is not None:
+            profiler_lines.append(
+                f"input p50 {summary['input_p50_ms']:.1f} ms  "
+                f"p99 {summary['input_p99_ms']:.1f} ms")
+
+    y = WINDOWHEIGHT
+    for line in reversed(profiler_lines):
+        textsurf = render_text(line, 20, BLACK, WHITE)
+        textrect = textsurf.get_rect(bottomleft=(0, y))
+        draw_sprite(textsurf, textrect)
+        y = textrect.top
+
+
+def draw_score(score):
+    """Draw the score text on the screen."""
+
+    draw_hud_text('score', f"Score: {score}", topleft=(0, 0))
+
+
+def draw_pb():
+    """Draw the pb text on the screen."""
+
+    # Get the current pb from memory.
+    pb = get_pb()
+
+    # Draw the text.
+    draw_hud_text('pb', f"Personal Best: {pb}", topright=(WINDOWWIDTH, 0))
+
+
+def draw_hud_text(name, text, **position):
+    """Draw a piece of HUD text, but only if it changed since it was last
+    drawn. The position is given like a Rect attribute, e.g. topleft."""
+
+    # Skip the text if it is already on the screen.
+    old = hud_text.get(name)
+    if old is not None and old[0] == text:
+        return
+
+    # Erase the old text.
+    if old is not None:
+        erase_rect(old[1])
+
+    # Draw the new text.
+    textsurf = render_text(text, 40, BLACK)
+    textrect = textsurf.get_rect(**position)
+    DISPLAYSURF.blit(textsurf, textrect)
+    dirty_rects.append(textrect)
+    hud_text[name] = (text, textrect)
+
+
+def draw_sprite(img, pos):
+    """Draw a moving image and remember where it went so it can be erased
+    next frame."""
+    rect = DISPLAYSURF.blit(img, pos)
+    sprite_rects.append(rect)
+
+
+def erase_rect(rect):
+    """Redraw the background over a part of the screen."""
+    DISPLAYSURF.blit(background_img, rect, rect)
+    dirty_rects.append(rect)
+
+
+def erase_sprites():
+    """Erase every sprite drawn last frame."""
+    global sprite_rects
+
+    for rect in sprite_rects:
+        erase_rect(rect)
+    sprite_rects = []
+
+
+def update_dirty_rects():
+    """Push only the changed parts of the screen to the display, or all of
+    it after the background was drawn again."""
+    global dirty_rects, full_update
+
+    # Sprites that were drawn this frame changed too.
+    dirty_rects.extend(sprite_rects)
+    if full_update:
+        pygame.display.update()
+        full_update = False
+    elif dirty_rects:
+        pygame.display.update(dirty_rects)
+    dirty_rects = []
+
+
+def reset_dirty_rects():
+    """Forget everything drawn, e.g. before drawing a whole new screen."""
+    global dirty_rects, sprite_rects, full_update
+
+    dirty_rects = []
+    sprite_rects = []
+    hud_text.clear()
+    full_update = False
+
+
+def redraw_background():
+    """Draw the whole background again, e.g. when the window gets uncovered
+    mid race. The HUD is drawn again too, and the next update pushes the
+    whole screen."""
+    global full_update
+
+    DISPLAYSURF.blit(background_img, (0, 0))
+    hud_text.clear()
+    full_update = True
+
+
+def queue_obstacles(race, sprite_batch, offset=0):
+    """Queue the race's active obstacles to be drawn from the atlas, offset
+    to the right by some pixels."""
+
+    for obstacle in race.obstacles:
+        area = atlas_areas[obstacle.kind]
+        pos = (race.obstacle_x(obstacle) + offset, obstacle.y)
+        sprite_batch.append((atlas_img, pos, area))
+
+
+def queue_arrows(race, sprite_batch, offset=0):
+    """Queue the race's active arrows to be drawn from the atlas, offset to
+    the right by some pixels. Each arrow x is a column of three."""
+
+    area = atlas_areas[ARROW]
+    for x in race.arrow_positions():
+        for lane in LANES:
+            pos = (x + offset, lane_y(lane) - ARROW_SIZE // 2)
+            sprite_batch.append((atlas_img, pos, area))
+
+
+def draw_sprite_batch(sprite_batch):
+    """Draw queued sprites with a single blits() call and remember where they
+    went so they can be erased next frame."""
+    sprite_rects.extend(DISPLAYSURF.blits(sprite_batch))
+
+
+def game_over(score):
+    """Run the game's game over screen."""
+
+    # Stop the music.
+    audio.stop_music()
+
+    # Play the game over sound.
+    audio.play_sound(GAME_OVER_SOUND)
+    
+    # Set up the game over fonts.
+    big_font = create_font(120)
+    button_font = create_font(75)
+
+    # Set up the game over text.
+    gamesurf = big_font.render('Game Over', False, BLACK, WHITE)
+    gamerect = gamesurf.get_rect()
+    gamerect.center = (CENTERX, CENTERY - 200)
+
+    # Set up the quit button.
+    quit_button = pygame.Rect(0, 0, 300, 100)
+    quit_button.center = (CENTERX + 200, CENTERY)
+
+    # Set up the restart button.
+    restart_button = pygame.Rect(0, 0, 300, 100)
+    restart_button.center = (CENTERX - 200, CENTERY)
+
+    # Set up the quit text.
+    quitsurf = button_font.render('Quit', False, RED)
+    quitrect = quitsurf.get_rect()
+    quitrect.center = quit_button.center
+
+    # Set up the restart text.
+    restartsurf = button_font.render('Restart', False, GREEN)
+    restartrect = restartsurf.get_rect()
+    restartrect.center = restart_button.center
+
+    # If the player got a new high score, then update the pb file.
+    if score > get_pb():
+        new_pb = True
+        write_new_pb(score)
+    else:
+        new_pb = False
+
+    # Blit the game over background.
+    DISPLAYSURF.blit(title_img, (0, 0))
+
+    # Draw the buttons.
+    pygame.draw.rect(DISPLAYSURF, BLACK, quit_button)
+    pygame.draw.rect(DISPLAYSURF, BLACK, restart_button)
+
+    # Draw the text that goes on top of the buttons.
+    DISPLAYSURF.blit(quitsurf, quitrect)
+    DISPLAYSURF.blit(restartsurf, restartrect)
+
+    # Draw the other text.
+    DISPLAYSURF.blit(gamesurf, gamerect)
+    draw_new_pb_msg(new_pb, score)
+
+    # Nothing on the game over screen moves either, so show it only once and
+    # again whenever the window gets uncovered.
+    show = True
+
+    # The leaderboard's answer comes in the background, while this runs.
+    result = None
+
+    # Run the game over loop.
+    while True:
+        # Check for events.
+        for event in pygame.event.get():
+            # Check for quit.
+            if event.type == QUIT:
+                terminate()
+
+            # Check if the window needs to be shown again.
+            if event.type in EXPOSE_EVENTS:
+                show = True
+
+            # Check if the player is pressing a key.
+            if event.type == KEYDOWN:
+                # Check for ESCAPE key.
+                if event.key == K_ESCAPE:
+                    terminate()
+
+            # Check if the player is clicking.
+            if event.type == MOUSEBUTTONDOWN:
+                # Check if the player clicked the quit button.
+                if quit_button.collidepoint(event.pos):
+                    # Quit the game.
+                    terminate()
+
+                # Check if the player clicked the restart button.
+                if restart_button.collidepoint(event.pos):
+                    # Restart the game.
+                    # Make sure the game over sound stops.
+                    audio.stop_sound(GAME_OVER_SOUND)
+                    return
+
+        # Check if the leaderboard has answered, and show the global rank.
+        if result is None:
+            result = score_client.result(score_submission)
+            if result is not None:
+                draw_global_rank(result)
+                show = True
+
+        # Update.
+        if show:
+            pygame.display.update()
+            show = False
+        MAINCLOCK.tick(MENU_FPS)
+
+
+def draw_global_rank(result):
+    """Draw the player's rank on the leaderboard, if the score was
+    accepted."""
+
+    if result.get('accepted'):
+        textsurf = render_text(
+            f"Global rank: {result['rank']} of {result['players']}", 40,
+            BLACK, WHITE)
+        textrect = textsurf.get_rect()
+        textrect.center = (CENTERX, CENTERY + 120)
+        DISPLAYSURF.blit(textsurf, textrect)
+
+
+def draw_new_pb_msg(new_pb, pb):
+    """Draw a message saying the player got a new pb."""
+
+    # Only draw the message if the player got a new pb.
+    if new_pb:
+        textsurf = render_text(f'You got a new personal best of {pb}!', 50,
+                               DARKGREEN, WHITE)
+        textrect = textsurf.get_rect()
+        textrect.center = (CENTERX, CENTERY + 200)
+        DISPLAYSURF.blit(textsurf, textrect)
+
+
+def write_new_pb(new_pb):
+    """Store a new pb in memory and save it to the file."""
+    global personal_best
+
+    personal_best = new_pb
+
+    # Write to a temporary file first and then swap it in, so the pb file is
+    # never left half written.
+    temp_path = PB_PATH.with_name(PB_PATH.name + '.tmp')
+    with temp_path.open('w', encoding='UTF-8') as file:
+        file.write(str(new_pb))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, PB_PATH)
+
+
+def load_pb():
+    """Load the pb from the text file into memory."""
+    global personal_best
+
+    # Check to make sure the pb file exists, and if not, create it.
+    if not PB_PATH.exists():
+        write_new_pb(0)
+        return
+
+    pb = PB_PATH.read_text(encoding='UTF-8').strip()
+    personal_best = int(pb) if pb else 0
+
+
+def get_pb():
+    """Return the current pb from memory."""
+
+    return personal_best
+
+
+def create_font(size):
+    """Return a font of the respective size, loading it the first time."""
+    font = fonts.get(size)
+    if font is None:
+        font = pygame.font.Font('freesansbold.ttf', size)
+        fonts[size] = font
+    return font
+
+
+def render_text(text, size, color, background=None):
+    """Render text, reusing the surface if the same text was drawn lately."""
+    key = (text, size, color, background)
+
+    # Reuse the cached surface and mark it as the most recently used.
+    textsurf = text_cache.get(key)
+    if textsurf is not None:
+        text_cache.move_to_end(key)
+        return textsurf
+
+    # Render the text and drop the least recently used surface if needed.
+    textsurf = create_font(size).render(text, False, color, background)
+    text_cache[key] = textsurf
+    if len(text_cache) > TEXT_CACHE_SIZE:
+        text_cache.popitem(last=False)
+    return textsurf
+
+
+def load_assets():
+    """Load all of the game's assets right away."""
+
+    load_title_assets()
+    start_loading_assets()
+    finish_loading_assets()
+
+
+def load_title_assets():
+    """Load just what the title screen needs."""
+    global title_img
+
+    # Load in the title image. The images are stored at their final size
+    # and converted to the display format by load_image().
+    title_img = load_image(IMAGES_PATH, 'title_background.jpeg')
+
+
+def start_loading_assets():
+    """Start reading the gameplay images, sounds and music on a background
+    thread, so the title screen shows without waiting for them."""
+    global asset_loader
+
+    executor = ThreadPoolExecutor(1)
+    asset_loader = executor.submit(read_game_assets)
+
+    # Let the loading thread end once the assets are read.
+    executor.shutdown(wait=False)
+
+
+def read_game_assets():
+    """Read the gameplay assets from disk and return them. This runs on the
+    loading thread, so it leaves everything that needs the display alone."""
+
+    # Start the mixer and load the music and sounds.
+    audio.load(MUSIC, [GAME_OVER_SOUND])
+
+    # Read the images.
+    return {name: read_image(IMAGES_PATH, name) for name in GAME_IMAGES}
+
+
+def finish_loading_assets():
+    """Wait for the loading thread and set up the gameplay assets."""
+    global car_img, car_rect, bg_img, bg_rect, arrow_img, rock_img
+    global barrel_img, oil_img
+    global atlas_img, atlas_areas, background_img
+
+    # Wait for the loading thread. This raises any error it ran into.
+    assets = asset_loader.result()
+
+    # Convert the images to the display format.
+    imgs = {name: convert_image(assets[name], name) for name in GAME_IMAGES}
+
+    # Position the background.
+    bg_img = imgs['race_track.png']
+    bg_rect = bg_img.get_rect()
+    bg_rect.center = (CENTERX, CENTERY)
+
+    # Put the background color and the track together. Sprites are erased by
+    # drawing this back over them.
+    background_img = pygame.Surface((WINDOWWIDTH, WINDOWHEIGHT)).convert()
+    background_img.fill(BG_COLOR)
+    background_img.blit(bg_img, bg_rect)
+
+    # Set up the car sprite.
+    car_img = imgs['car.png']
+    car_rect = car_img.get_rect()
+
+    # Set up the arrow and the obstacles.
+    arrow_img = imgs['arrow.png']
+    rock_img = imgs['rock.png']
+    barrel_img = imgs['barrel.png']
+    oil_img = imgs['oil.png']
+
+    # Pack the arrow and obstacles into one atlas, looked up by the race's
+    # obstacle kinds, so each frame draws them in one batch.
+    atlas_img, atlas_areas = build_atlas({ARROW: arrow_img, ROCK: rock_img,
+                                          BARREL: barrel_img, OIL: oil_img})
+
+
+def terminate():
+    """Close out of the game."""
+
+    # Save the frame timings if a trace file was asked for.
+    if PROFILE_PATH:
+        profiler.dump(PROFILE_PATH)
+
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""Tournament runner for Speed Racer bots. Runs many seeded headless races
+per policy across a process pool and prints one aggregated report.
+
+A policy is any function that takes a race_sim.RaceState and returns UP,
+DOWN or NONE. Pass a built-in policy name or "module:function" for your own:
+
+    python tournament.py dodge idle my_bots:careful --races 10000
+"""
+
+import argparse, importlib, json, os, random, statistics, time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from race_sim import (UP, DOWN, NONE, TOP_LANE, BOTTOM_LANE, CAR_X,
+                      CAR_WIDTH, run_race, nearest_obstacles)
+
+# How many frames ahead of the car the dodge policy looks.
+DODGE_LOOKAHEAD = 12
+
+# Races per task handed to a worker. Big enough to keep the pool overhead
+# small, small enough to spread the races evenly over the workers.
+CHUNKS_PER_WORKER = 4
+
+
+def idle_policy(state):
+    """Never change lanes."""
+    return NONE
+
+
+def random_policy(state):
+    """Change lanes at random every now and then."""
+    if random.random() < 0.05:
+        return random.choice([UP, DOWN])
+    return NONE
+
+
+def dodge_policy(state):
+    """Move to the neighbouring lane with the most room when something is
+    about to hit the car."""
+    nearest = nearest_obstacles(state)
+    danger = CAR_X + CAR_WIDTH + state.game_speed * DODGE_LOOKAHEAD
+
+    # Stay put if the car's lane is clear for now.
+    ahead = nearest[state.car_lane]
+    if ahead is None or ahead >= danger:
+        return NONE
+
+    # Pick the neighbouring lane whose nearest obstacle is furthest away.
+    best_action, best_room = NONE, ahead
+    for action in (UP, DOWN):
+        lane = state.car_lane + action
+        if lane < BOTTOM_LANE or lane > TOP_LANE:
+            continue
+        room = nearest[lane]
+        if room is None:
+            return action
+        if room >= CAR_X + CAR_WIDTH and room > best_room:
+            best_action, best_room = action, room
+    return best_action
+
+
+POLICIES = {
+    'idle': idle_policy,
+    'random': random_policy,
+    'dodge': dodge_policy,
+}
+
+
+def load_policy(spec):
+    """Return the policy named by a built-in name or "module:function"."""
+    if spec in POLICIES:
+        return POLICIES[spec]
+
+    module_name, _, func_name = spec.partition(':')
+    if not func_name:
+        raise ValueError(f"Unknown policy {spec!r}. Use one of "
+                         f"{', '.join(POLICIES)} or module:function.")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def run_chunk(spec, seeds, max_frames):
+    """Run one race per seed with a policy and return the raw results."""
+    policy = load_policy(spec)
+    results = []
+    for seed in seeds:
+        # Seed the random module too so policies that use it are repeatable.
+        random.seed(seed)
+        state = run_race(policy, seed, max_frames)
+        results.append((seed, state.score, state.pace, state.crash_cause))
+    return results
+
+
+def summarize(spec, results):
+    """Aggregate the raw results of one policy into a report entry."""
+    scores = [score for _, score, _, _ in results]
+    frames = [pace for _, _, pace, _ in results]
+    causes = Counter(cause or 'survived' for _, _, _, cause in results)
+    best = max(results, key=lambda result: result[1])
+
+    return {
+        'policy': spec,
+        'races': len(results),
+        'mean_score': statistics.fmean(scores),
+        'median_score': statistics.median(scores),
+        'max_score': best[1],
+        'best_seed': best[0],
+        'mean_frames': statistics.fmean(frames),
+        'max_frames': max(frames),
+        'crash_causes': dict(causes.most_common()),
+    }
+
+
+def run_tournament(specs, races, workers=None, first_seed=0, max_frames=None):
+    """Run the same seeded races for every policy and return the report."""
+    workers = workers or os.cpu_count()
+    seeds = list(range(first_seed, first_seed + races))
+    chunk = max(1, races // (workers * CHUNKS_PER_WORKER))
+    chunks = [seeds[i:i + chunk] for i in range(0, races, chunk)]
+
+    # Load every policy once up front so typos fail before the pool starts.
+    for spec in specs:
+        load_policy(spec)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {spec: [pool.submit(run_chunk, spec, seeds, max_frames)
+                          for seeds in chunks]
+                   for spec in specs}
+        report = [summarize(spec, [result for future in futures[spec]
+                                   for result in future.result()])
+                  for spec in specs]
+    elapsed = time.perf_counter() - start
+
+    total_frames = sum(entry['mean_frames'] * entry['races']
+                       for entry in report)
+    return {
+        'workers': workers,
+        'seconds': elapsed,
+        'frames_per_second': total_frames / elapsed,
+        'policies': report,
+    }
+
+
+def print_report(report):
+    """Print a tournament report as a table."""
+    print(f"{'policy':<20}{'races':>8}{'mean':>10}{'median':>10}"
+          f"{'max':>8}{'frames':>10}  crash causes")
+    for entry in sorted(report['policies'], key=lambda e: -e['mean_score']):
+        causes = ', '.join(f'{cause} {count}'
+                           for cause, count in entry['crash_causes'].items())
+        print(f"{entry['policy']:<20}{entry['races']:>8}"
+              f"{entry['mean_score']:>10.1f}{entry['median_score']:>10.1f}"
+              f"{entry['max_score']:>8}{entry['mean_frames']:>10.1f}"
+              f"  {causes}")
+    print(f"{report['workers']} workers, {report['seconds']:.2f}s, "
+          f"{report['frames_per_second']:,.0f} frames/s")
+
+
+def main():
+    """Parse the command line and run a tournament."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('policies', nargs='+',
+                        help='built-in policy name or module:function')
+    parser.add_argument('--races', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the first race')
+    parser.add_argument('--max-frames', type=int, default=None,
+                        help='stop races that survive this long')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    report = run_tournament(args.policies, args.races, args.workers,
+                            args.seed, args.max_frames)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
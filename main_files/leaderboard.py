@@ -0,0 +1,168 @@
+"""Global leaderboard for Speed Racer, stored in SQLite. Every player keeps
+their best score in the players table, indexed by score for the top of the
+board.
+
+Counting the players ahead of someone with COUNT(*) reads every one of
+them, so ranks come from a Fenwick tree instead. Scores are grouped into
+buckets of SCORE_STEP, highest first, and the rank_tree table holds the
+tree's nodes over the buckets. A rank is then a sum over at most
+RANK_TREE_BITS nodes, looked up by primary key in a single query, and a new
+best updates as many. Scores past the last bucket all share it.
+
+Every race counts for one player only. The races table keeps the seed of
+every race submitted and who sent it.
+
+Every statement is a constant string, so sqlite3's statement cache keeps
+them prepared on each connection.
+"""
+
+import time
+
+# Scores go up by 10 for every obstacle passed, so each bucket holds a
+# single score up to 10 * 2**20.
+SCORE_STEP = 10
+RANK_TREE_BITS = 20
+RANK_TREE_SIZE = 1 << RANK_TREE_BITS
+
+# Limits on what players can send and ask for.
+MAX_NAME_LENGTH = 20
+MAX_TOP = 100
+
+CREATE_TABLES = [
+    'CREATE TABLE IF NOT EXISTS players ('
+    'name TEXT PRIMARY KEY, best INTEGER NOT NULL, achieved REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS players_by_best '
+    'ON players (best DESC, achieved)',
+    'CREATE TABLE IF NOT EXISTS rank_tree ('
+    'node INTEGER PRIMARY KEY, count INTEGER NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS races ('
+    'seed TEXT PRIMARY KEY, name TEXT NOT NULL)',
+]
+SELECT_BEST = 'SELECT best FROM players WHERE name = ?'
+INSERT_PLAYER = 'INSERT INTO players (name, best, achieved) VALUES (?, ?, ?)'
+UPDATE_PLAYER = 'UPDATE players SET best = ?, achieved = ? WHERE name = ?'
+SELECT_RACE = 'SELECT name FROM races WHERE seed = ?'
+INSERT_RACE = 'INSERT INTO races (seed, name) VALUES (?, ?)'
+UPDATE_NODE = ('INSERT INTO rank_tree (node, count) VALUES (?, ?) '
+               'ON CONFLICT (node) DO UPDATE SET count = count + '
+               'excluded.count')
+SUM_NODES = ('SELECT COALESCE(SUM(count), 0) FROM rank_tree WHERE node IN ('
+             + ', '.join('?' * RANK_TREE_BITS) + ')')
+SELECT_TOP = ('SELECT name, best FROM players '
+              'ORDER BY best DESC, achieved LIMIT ?')
+
+
+def setup_db(db):
+    """Turn on write-ahead logging and create the leaderboard's tables."""
+    db.execute('PRAGMA journal_mode = WAL')
+    db.execute('PRAGMA synchronous = NORMAL')
+    for statement in CREATE_TABLES:
+        db.execute(statement)
+
+
+def check_name(name):
+    """Raise ValueError unless name is a valid player name."""
+    if (not isinstance(name, str) or not 0 < len(name) <= MAX_NAME_LENGTH
+            or not name.isprintable() or name != name.strip()):
+        raise ValueError(f'Player names must be 1 to {MAX_NAME_LENGTH} '
+                         'printable characters.')
+
+
+def score_bucket(score):
+    """Return the tree position of a score's bucket. The highest scores
+    come first, so the buckets before a score's hold everyone ahead."""
+    return RANK_TREE_SIZE - min(score // SCORE_STEP, RANK_TREE_SIZE - 1)
+
+
+def update_tree(db, bucket, change):
+    """Add change to a bucket's count in the rank tree."""
+    nodes = []
+    while bucket <= RANK_TREE_SIZE:
+        nodes.append((bucket, change))
+        bucket += bucket & -bucket
+    db.executemany(UPDATE_NODE, nodes)
+
+
+def count_before(db, bucket):
+    """Return how many players are in the buckets before the given one."""
+    nodes = []
+    bucket -= 1
+    while bucket > 0:
+        nodes.append(bucket)
+        bucket -= bucket & -bucket
+
+    # Pad with node 0, which never exists, to keep the statement the same.
+    nodes += [0] * (RANK_TREE_BITS - len(nodes))
+    return db.execute(SUM_NODES, nodes).fetchone()[0]
+
+
+def submit_score(db, name, score, seed):
+    """Record the score of the race with the given seed, keeping it if it is
+    the player's best. Returns the player's best score afterwards. Raises
+    ValueError if another player already sent the race."""
+    check_name(name)
+    if type(score) is not int or score < 0 or score % SCORE_STEP:
+        raise ValueError('Scores must be multiples of '
+                         f'{SCORE_STEP} of at least 0.')
+
+    # Take the write lock up front, so no other submission can change the
+    # player's best between reading and updating it.
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        # Seeds don't fit SQLite's signed integers, so they are kept as hex.
+        seed = f'{seed:016x}'
+        race = db.execute(SELECT_RACE, (seed,)).fetchone()
+        if race is None:
+            db.execute(INSERT_RACE, (seed, name))
+        elif race[0] != name:
+            raise ValueError('This race was already sent by another player.')
+
+        row = db.execute(SELECT_BEST, (name,)).fetchone()
+        if row is None:
+            db.execute(INSERT_PLAYER, (name, score, time.time()))
+            update_tree(db, score_bucket(score), 1)
+        elif score > row[0]:
+            db.execute(UPDATE_PLAYER, (score, time.time(), name))
+            if score_bucket(score) != score_bucket(row[0]):
+                update_tree(db, score_bucket(row[0]), -1)
+                update_tree(db, score_bucket(score), 1)
+        db.execute('COMMIT')
+    except BaseException:
+        db.execute('ROLLBACK')
+        raise
+    return score if row is None else max(score, row[0])
+
+
+def score_rank(db, score):
+    """Return the rank a score would have: one more than the number of
+    players with a higher best."""
+    return count_before(db, score_bucket(score)) + 1
+
+
+def player_count(db):
+    """Return the number of players on the leaderboard."""
+    return count_before(db, RANK_TREE_SIZE + 1)
+
+
+def player_rank(db, name):
+    """Return a dict with a player's best score, rank and the number of
+    players, or None if the player has no score yet."""
+    check_name(name)
+    row = db.execute(SELECT_BEST, (name,)).fetchone()
+    if row is None:
+        return None
+    return {'player': name, 'best': row[0], 'rank': score_rank(db, row[0]),
+            'players': player_count(db)}
+
+
+def top_scores(db, limit):
+    """Return the best limit players, best first, with their ranks. Players
+    with the same best share a rank."""
+    limit = min(max(limit, 0), MAX_TOP)
+    top = []
+    for name, best in db.execute(SELECT_TOP, (limit,)):
+        rank = len(top) + 1
+        if top and top[-1]['best'] == best:
+            rank = top[-1]['rank']
+        top.append({'player': name, 'best': best, 'rank': rank})
+    return top
@@ -0,0 +1,110 @@
+"""Static asset manifest for the Speed Racer site. Every file the site serves
+from the static folder is fingerprinted with a hash of its contents. Pages
+link to it as /static/<path>?v=<hash>, so a URL's content never changes and
+browsers can cache it for a year without asking again.
+
+Compressible files also get precompressed .gz and .br copies next to them,
+so the site never compresses anything while serving. Run this script after
+changing a static file to write them and print the manifest:
+
+    python static_assets.py
+
+The .br copies need the brotli package. Without it only .gz is written.
+"""
+
+import gzip, hashlib, json, os, sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_PATH = Path(__file__).parent / 'static'
+
+# Hex digits of the content hash kept in URLs.
+HASH_LENGTH = 12
+
+# Files worth compressing, and the precompressed copies' encodings and
+# suffixes, best first. Copies that don't come out smaller are not kept.
+COMPRESSIBLE_SUFFIXES = {'.css', '.txt', '.svg', '.xml', '.webmanifest',
+                         '.ico', '.html', '.js', '.json'}
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+ENCODING_SUFFIXES = {suffix for _, suffix in ENCODINGS}
+
+
+def static_files(folder=STATIC_PATH):
+    """Yield the path of every site file in the static folder."""
+    folder = Path(folder)
+    for path in sorted(folder.rglob('*')):
+        if (path.is_file() and not path.name.startswith('.')
+                and path.suffix not in ENCODING_SUFFIXES):
+            yield path
+
+
+def file_hash(path):
+    """Return the shortened content hash of a file."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:HASH_LENGTH]
+
+
+def build_manifest(folder=STATIC_PATH):
+    """Return a dict mapping each site file's path, relative to the static
+    folder, to its content hash."""
+    folder = Path(folder)
+    return {path.relative_to(folder).as_posix(): file_hash(path)
+            for path in static_files(folder)}
+
+
+def compress(data, encoding):
+    """Compress data as much as possible in an HTTP content encoding. The
+    output only depends on the data, so rebuilding changes nothing."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_static(folder=STATIC_PATH):
+    """Write precompressed copies of every compressible site file, and
+    remove copies that no longer pay off."""
+    for path in static_files(folder):
+        if path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+
+        data = path.read_bytes()
+        for encoding, suffix in ENCODINGS:
+            copy_path = path.with_name(path.name + suffix)
+            if encoding == 'br' and brotli is None:
+                continue
+
+            compressed = compress(data, encoding)
+            if len(compressed) < len(data):
+                # Write to a temporary file first, as the site may be
+                # serving the old copy.
+                temp_path = copy_path.with_name(copy_path.name + '.tmp')
+                temp_path.write_bytes(compressed)
+                os.replace(temp_path, copy_path)
+            elif copy_path.exists():
+                copy_path.unlink()
+
+
+def find_precompressed(folder=STATIC_PATH):
+    """Return a dict mapping each site file with up to date precompressed
+    copies to the encodings it has, best first."""
+    folder = Path(folder)
+    precompressed = {}
+    for path in static_files(folder):
+        modified = path.stat().st_mtime
+        encodings = []
+        for encoding, suffix in ENCODINGS:
+            copy_path = path.with_name(path.name + suffix)
+            if copy_path.exists() and copy_path.stat().st_mtime >= modified:
+                encodings.append(encoding)
+        if encodings:
+            precompressed[path.relative_to(folder).as_posix()] = encodings
+    return precompressed
+
+
+if __name__ == '__main__':
+    folder = sys.argv[1] if len(sys.argv) > 1 else STATIC_PATH
+    compress_static(folder)
+    print(json.dumps(build_manifest(folder), indent=4))
@@ -0,0 +1,126 @@
+"""Check the score client against a stub leaderboard on localhost. It checks
+that scores are spooled while the server is down, sent in one batch once it
+comes up, and not sent again after the server turns them down:
+
+    python tests/check_score_client.py
+
+Prints ok, or stops at the first check that fails.
+"""
+
+import json, socket, sys, tempfile, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+
+SCRIPTS_PATH = (Path(__file__).resolve().parent.parent / 'main_files'
+                / 'game' / 'scripts')
+sys.path.insert(0, str(SCRIPTS_PATH))
+
+import score_client
+from score_client import ScoreClient
+
+# Retry quickly, so the check doesn't wait on the real delays.
+score_client.FIRST_RETRY = 0.1
+score_client.MAX_RETRY = 0.4
+
+# How long to wait for the client before failing a check.
+CHECK_TIMEOUT = 10
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers score submissions with the server's status, accepting every
+    score when that is 200."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        scores = json.loads(body)['scores']
+        self.server.batches.append([score['score'] for score in scores])
+
+        if self.server.status == 200:
+            data = json.dumps({'results': [
+                {'accepted': True, 'rank': 1, 'players': 1}
+                for _ in scores]}).encode('UTF-8')
+        else:
+            data = json.dumps({'error': 'Turned down.'}).encode('UTF-8')
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def free_port():
+    """Return a localhost port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_stub(port):
+    """Start the stub leaderboard on a port and return it."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.batches = []
+    server.status = 200
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def wait_until(check, what):
+    """Wait for check() to be true, failing if it takes too long."""
+    end = time.monotonic() + CHECK_TIMEOUT
+    while not check():
+        assert time.monotonic() < end, f'Timed out waiting for {what}.'
+        time.sleep(0.01)
+
+
+def read_spool(path):
+    """Return the scores waiting in a spool file."""
+    try:
+        return [submission['score'] for submission in
+                json.loads(path.read_text(encoding='UTF-8'))]
+    except OSError:
+        return []
+
+
+def main():
+    port = free_port()
+    with tempfile.TemporaryDirectory() as folder:
+        spool_path = Path(folder) / 'spool.json'
+        client = ScoreClient(f'http://127.0.0.1:{port}', spool_path,
+                             Path(folder) / 'name.txt')
+        client.start()
+
+        # Scores are spooled while the server is down.
+        ids = [client.submit(score) for score in (10, 20, 30)]
+        wait_until(lambda: read_spool(spool_path) == [10, 20, 30]
+                   and client.retry_delay > score_client.FIRST_RETRY,
+                   'the first send to fail')
+        assert all(client.result(id) is None for id in ids)
+
+        # Once the server is up, they all go in one request.
+        server = start_stub(port)
+        wait_until(lambda: all(client.result(id) for id in ids),
+                   'the spooled scores to be sent')
+        assert server.batches == [[10, 20, 30]], server.batches
+        assert all(client.result(id)['accepted'] for id in ids)
+        assert read_spool(spool_path) == []
+
+        # Scores the server turns down are dropped, not sent again.
+        server.status = 400
+        ids = [client.submit(score) for score in (40, 50)]
+        wait_until(lambda: all(client.result(id) for id in ids),
+                   'the server to turn the scores down')
+        time.sleep(score_client.MAX_RETRY * 2)
+        assert server.batches == [[10, 20, 30], [40, 50]], server.batches
+        assert all(client.result(id) == {'accepted': False,
+                                         'error': 'HTTP 400'} for id in ids)
+        assert read_spool(spool_path) == []
+        server.shutdown()
+    print('ok')
+
+
+if __name__ == '__main__':
+    main()